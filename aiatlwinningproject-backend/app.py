@@ -5,6 +5,7 @@ import json
 import os
 import random
 import re
+import time
 import uuid
 from collections import defaultdict
 from datetime import datetime, timedelta
@@ -14,19 +15,43 @@ from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 import httpx
 import joblib
 import numpy as np
-from fastapi import FastAPI, HTTPException, Depends, status, Request, Body
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Body, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, EmailStr
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 from feature_encoder import FeatureEncoder
-from database import connect_db, close_db, get_db
+from catalog_watcher import CatalogWatcher, ListingCatalog
+from database import connect_db, close_db, get_db, ensure_indexes, write_concern_from_env
 from models import (
     UserSchema, UserCreate, UserResponse, SellerProfileSchema,
-    SalesHistorySummary, MessageSchema, MessageThreadSchema
+    SalesHistorySummary, MessageSchema, MessageThreadSchema, dm_pair_key
+)
+from auth import (
+    TokenCache,
+    create_access_token,
+    hash_password_async,
+    password_needs_rehash,
+    shutdown_password_pool,
+    verify_password_async,
+)
+from realtime import ConnectionManager
+from inbox_cache import InboxCache
+from gemini_client import GEMINI_TIMEOUT_SECONDS, GeminiHTTPClient
+from parse_cache import ParseCache
+from circuit_breaker import CircuitBreaker
+from local_parser import parse_request_locally, tokenize
+from parse_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    LimiterTimeout,
+    PriorityLimiter,
 )
-from auth import hash_password, verify_password, create_access_token, verify_token
 
 
 ROOT_DIR = Path(__file__).resolve().parent
@@ -36,6 +61,17 @@ SYNTHETIC_DATA_DIR = ROOT_DIR / "synthetic-data"
 CAMPUS_SELLERS_PATH = ROOT_DIR / "campus_sellers.json"
 
 GEMINI_SERVICE_URL = os.getenv("GEMINI_SERVICE_URL", "http://127.0.0.1:3001")
+# Typo-tolerant search kicks in when exact search finds fewer listings than this
+FUZZY_SEARCH_MIN_RESULTS = int(os.getenv("FUZZY_SEARCH_MIN_RESULTS", "5"))
+# Items the Gemini service parses at once within a batch call (its BATCH_CONCURRENCY)
+GEMINI_BATCH_CONCURRENCY = max(1, int(os.getenv("GEMINI_BATCH_CONCURRENCY", "4")))
+# Profiles parsed per Gemini batch call during bulk ingestion: two rounds of the service's concurrency
+PROFILE_INGEST_BATCH_SIZE = int(
+    os.getenv("PROFILE_INGEST_BATCH_SIZE", str(GEMINI_BATCH_CONCURRENCY * 2))
+)
+PROFILE_INGEST_MAX_ERRORS = 50
+# Write concern for message sends, e.g. "1" or "majority" (unset: server default)
+MESSAGE_WRITE_CONCERN = write_concern_from_env("MESSAGE_WRITE_CONCERN")
 
 if not MODEL_PATH.exists():
     raise RuntimeError(f"Expected to find model artefact at {MODEL_PATH}")
@@ -1300,15 +1336,6 @@ DEMO_PROFILE_HISTORY: Dict[str, List[Dict[str, Any]]] = {
 }
 
 
-WORD_RE = re.compile(r"[A-Za-z0-9']+")
-
-
-def tokenize(text: Optional[str]) -> List[str]:
-    if not text:
-        return []
-    return [token.lower() for token in WORD_RE.findall(str(text)) if len(token) > 2]
-
-
 def tokens_from_iterable(values: Optional[Iterable[Any]]) -> Set[str]:
     tokens: Set[str] = set()
     if not values:
@@ -1318,30 +1345,40 @@ def tokens_from_iterable(values: Optional[Iterable[Any]]) -> Set[str]:
     return tokens
 
 
-def build_seller_keyword_index() -> Dict[str, Set[str]]:
-    index: Dict[str, Set[str]] = {}
-    for entry in DEMO_SELLER_PROFILES:
-        tokens: Set[str] = set()
-        tokens.update(tokenize(entry.get("raw_text")))
+def seller_keyword_tokens(
+    raw_text: Optional[str],
+    parsed_profile: Optional[Dict[str, Any]],
+    representative_item: Optional[Dict[str, Any]],
+) -> Set[str]:
+    tokens: Set[str] = set()
+    tokens.update(tokenize(raw_text))
 
-        parsed_profile = entry.get("parsed_profile") or {}
-        tokens.update(tokens_from_iterable(parsed_profile.get("profile_keywords")))
-        tokens.update(tokens_from_iterable(parsed_profile.get("related_categories_of_interest")))
+    parsed_profile = parsed_profile or {}
+    tokens.update(tokens_from_iterable(parsed_profile.get("profile_keywords")))
+    tokens.update(tokens_from_iterable(parsed_profile.get("related_categories_of_interest")))
 
-        for summary in parsed_profile.get("sales_history_summary") or []:
-            tokens.update(tokenize(summary.get("category")))
-            tokens.update(tokens_from_iterable(summary.get("item_examples")))
+    for summary in parsed_profile.get("sales_history_summary") or []:
+        tokens.update(tokenize(summary.get("category")))
+        tokens.update(tokens_from_iterable(summary.get("item_examples")))
 
-        representative_item = entry.get("representative_item") or {}
-        item_meta = representative_item.get("item_meta") or {}
-        tokens.update(tokenize(item_meta.get("parsed_item")))
-        tokens.update(tokens_from_iterable(item_meta.get("tags")))
+    representative_item = representative_item or {}
+    item_meta = representative_item.get("item_meta") or {}
+    tokens.update(tokenize(item_meta.get("parsed_item")))
+    tokens.update(tokens_from_iterable(item_meta.get("tags")))
 
-        item_context = representative_item.get("context") or {}
-        tokens.update(tokenize(item_context.get("original_text")))
+    item_context = representative_item.get("context") or {}
+    tokens.update(tokenize(item_context.get("original_text")))
 
-        index[entry["user_id"]] = {token for token in tokens if token}
-    return index
+    return {token for token in tokens if token}
+
+
+def build_seller_keyword_index() -> Dict[str, Set[str]]:
+    return {
+        entry["user_id"]: seller_keyword_tokens(
+            entry.get("raw_text"), entry.get("parsed_profile"), entry.get("representative_item")
+        )
+        for entry in DEMO_SELLER_PROFILES
+    }
 
 
 SELLER_KEYWORD_INDEX = build_seller_keyword_index()
@@ -1461,21 +1498,137 @@ class PingMatchesRequest(BaseModel):
     )
 
 
+class MessageSendRequest(BaseModel):
+    text: str
+    senderId: Optional[str] = None
+
+
+class MarkReadRequest(BaseModel):
+    upTo: Optional[str] = Field(
+        default=None, description="Cursor of the last message read; omitted marks everything read"
+    )
+
+
 flash_requests: Dict[str, Dict[str, Any]] = {}
 seller_profiles: Dict[str, Dict[str, Any]] = {}
+# Open /ws connections; events published here reach users on any worker the broker spans
+realtime = ConnectionManager()
+inbox_cache = InboxCache(broker=realtime.broker)
 message_threads: Dict[str, Dict[str, Any]] = {}  # threadId -> thread data
 thread_messages: Dict[str, List[Dict[str, Any]]] = {}  # threadId -> list of messages
 user_threads: Dict[str, str] = {}  # userId -> threadId mapping (for current user)
 
 
-async def call_gemini_parser(endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+# Pooled keep-alive client for the Gemini service; opened and closed with the app
+gemini_http = GeminiHTTPClient()
+# Identical texts are parsed once per parser version; results persist across restarts
+parse_cache = ParseCache()
+# Stops waiting on a slow or asleep Gemini service; callers fall back immediately
+gemini_breaker = CircuitBreaker("Gemini parser")
+# Caps parses in flight so bursts queue here, interactive ones first, instead of at Gemini
+gemini_limiter = PriorityLimiter()
+
+
+async def call_gemini_parser(
+    endpoint: str, payload: Dict[str, Any], priority: str = PRIORITY_INTERACTIVE
+) -> Dict[str, Any]:
+    cached = await parse_cache.get(endpoint, payload)
+    if cached is not None:
+        return cached
+
+    parsed = await post_to_gemini(endpoint, payload, priority=priority)
+    await parse_cache.set(endpoint, payload, parsed)
+    return parsed
+
+
+async def call_gemini_parser_batch(
+    endpoint: str, payloads: List[Dict[str, Any]], priority: str = PRIORITY_BULK
+) -> List[Dict[str, Any]]:
+    """
+    Parse many payloads through ``{endpoint}/batch`` in one round trip.
+
+    Returns one ``{"ok": True, "data": ...}`` or ``{"ok": False, "error": ...}``
+    per payload, in order; cache hits never leave the process.  Raises
+    HTTPException like ``call_gemini_parser`` if the whole call fails.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+    misses: List[int] = []
+    for index, payload in enumerate(payloads):
+        cached = await parse_cache.get(endpoint, payload)
+        if cached is not None:
+            results[index] = {"ok": True, "data": cached}
+        else:
+            misses.append(index)
+
+    if misses:
+        response = await post_to_gemini(
+            f"{endpoint}/batch",
+            {"items": [payloads[index] for index in misses]},
+            priority=priority,
+            items=len(misses),
+        )
+        for entry in response.get("results") or []:
+            position = entry.get("index")
+            if not isinstance(position, int) or not 0 <= position < len(misses):
+                continue
+            index = misses[position]
+            if entry.get("ok"):
+                await parse_cache.set(endpoint, payloads[index], entry["data"])
+                results[index] = {"ok": True, "data": entry["data"]}
+            else:
+                results[index] = {"ok": False, "error": entry.get("error") or "Parse failed"}
+
+    return [result or {"ok": False, "error": "Missing from batch response"} for result in results]
+
+
+async def post_to_gemini(
+    endpoint: str, payload: Dict[str, Any], priority: str = PRIORITY_INTERACTIVE, items: int = 1
+) -> Dict[str, Any]:
+    """
+    POST to the Gemini service once ``gemini_limiter`` grants a slot at
+    ``priority``, through the circuit breaker; errors become HTTPExceptions.
+
+    An open breaker is checked before queueing, so callers never wait
+    for a slot only to be turned away, and again once the slot is granted.
+    A batch of ``items`` holds as many slots as the Gemini calls the
+    service makes for it at once.
+    """
+    if gemini_breaker.is_open():
+        raise_breaker_open()
+    try:
+        async with gemini_limiter.slot(priority, weight=min(items, GEMINI_BATCH_CONCURRENCY)):
+            return await send_to_gemini(endpoint, payload, items)
+    except LimiterTimeout as exc:
+        raise HTTPException(
+            status_code=503,
+            detail={"message": f"Gemini parsing service is busy ({exc})"},
+        ) from exc
+
+
+def raise_breaker_open() -> None:
+    raise HTTPException(
+        status_code=503,
+        detail={"message": "Gemini parsing service is unavailable (circuit open)"},
+    )
+
+
+async def send_to_gemini(endpoint: str, payload: Dict[str, Any], items: int) -> Dict[str, Any]:
+    if not gemini_breaker.allow():
+        raise_breaker_open()
+
     url = f"{GEMINI_SERVICE_URL.rstrip('/')}{endpoint}"
+    # The service works through a batch GEMINI_BATCH_CONCURRENCY items at a time
+    rounds = -(-max(1, items) // GEMINI_BATCH_CONCURRENCY)
+    started = time.perf_counter()
+    success: Optional[bool] = None
     try:
-        # Reduced timeout to 10 seconds to prevent long waits
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+        response = await gemini_http.post_json(
+            url, payload, timeout=GEMINI_TIMEOUT_SECONDS * rounds if items > 1 else None
+        )
+        # A 4xx is the request's fault, not a sign the service is unhealthy
+        success = response.status_code < 500
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as exc:
         raise HTTPException(
             status_code=exc.response.status_code,
@@ -1485,10 +1638,17 @@ async def call_gemini_parser(endpoint: str, payload: Dict[str, Any]) -> Dict[str
             },
         ) from exc
     except httpx.RequestError as exc:
+        success = False
         raise HTTPException(
             status_code=502,
             detail={"message": f"Gemini parsing service is unavailable: {exc}"},
         ) from exc
+    except ValueError:
+        success = False
+        raise
+    finally:
+        # Batch calls are judged on per-round latency so they do not read as slow
+        gemini_breaker.record(success, (time.perf_counter() - started) / rounds)
 
 
 def urgency_from_ui(urgency_idx: Optional[int]) -> Optional[str]:
@@ -1744,10 +1904,19 @@ def encode_and_score(request_record: Dict[str, Any], profile_record: Dict[str, A
         print(f"[WARNING] encode_and_score: Missing parsed_request in request_record")
         parsed_request = {}
     
+    # Seller-side features are encoded once per profile record and reused
+    seller_block = profile_record.get("seller_block")
+    if seller_block is None:
+        seller_block = encoder.encode_seller_block(
+            profile_record.get("parsed_profile", {}),
+            profile_record.get("representative_item"),
+        )
+        profile_record["seller_block"] = seller_block
     feature_row, activated = encoder.encode(
         parsed_request,
         profile_record.get("parsed_profile", {}),
         profile_record.get("representative_item"),
+        seller_block=seller_block,
     )
     probabilities = model.predict_proba([feature_row])[0]
     probability = float(probabilities[positive_class_index])
@@ -2011,14 +2180,94 @@ async def build_match_payload(request_id: str, request_record: Dict[str, Any]) -
     }
 
 
+# ============================================================================
+# Authentication Dependencies
+# ============================================================================
+
+security = HTTPBearer()
+token_cache = TokenCache()
+
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    if authorization and authorization.startswith("Bearer "):
+        return authorization.split(" ")[1]
+    return None
+
+
+def token_subject(token: Optional[str]) -> Optional[str]:
+    """``sub`` of a valid token, or None; verified tokens are cached until they expire."""
+    if not token:
+        return None
+    try:
+        return token_cache.verify(token).get("sub")
+    except ValueError:
+        return None
+
+
+async def token_user_id(request: Request) -> Optional[str]:
+    """The caller's user id from a valid bearer token, or None."""
+    return token_subject(bearer_token(request.headers.get("Authorization")))
+
+
+async def resolve_caller(request: Request, user_id: Optional[str] = Depends(token_user_id)) -> str:
+    """
+    The caller for the messaging endpoints: the token's user, else the
+    legacy ``current_user`` query parameter, else ``"current_user"``.
+    """
+    return user_id or request.query_params.get("current_user") or "current_user"
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current user from JWT token."""
+    try:
+        payload = token_cache.verify(credentials.credentials)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+
+    db = get_db()
+    user = await db.users.find_one({"_id": ObjectId(user_id)}) if ObjectId.is_valid(user_id) else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    return user
+
+
+# Startup index builds, referenced until they finish
+_index_tasks: Set[asyncio.Task] = set()
+
+
+async def provision_indexes() -> None:
+    try:
+        created = await ensure_indexes()
+        if created:
+            print(f"[OK] Ensured indexes: {', '.join(f'{name}({len(idx)})' for name, idx in created.items())}")
+    except Exception as e:
+        print(f"[WARNING] Index provisioning failed: {e}")
+
+
 @app.on_event("startup")
 async def startup_event() -> None:
     # Connect to MongoDB (non-blocking if it fails)
     try:
-        await connect_db()
+        db = await connect_db()
+        if db is not None:
+            # Build indexes in the background so startup never waits on them
+            task = asyncio.create_task(provision_indexes())
+            _index_tasks.add(task)
+            task.add_done_callback(_index_tasks.discard)
         # Pre-populate user name cache from database
         try:
-            db = get_db()
             if db is not None:
                 users_cursor = db.users.find({})
                 users = await users_cursor.to_list(length=1000)
@@ -2042,11 +2291,26 @@ async def startup_event() -> None:
         print(f"[ERROR] Failed to load demo profiles: {e}")
         import traceback
         traceback.print_exc()
+    # Index campus_sellers.json off the event loop and watch it for changes
+    try:
+        await catalog_watcher.start()
+        print(f"[OK] Indexed {len(catalog_watcher.current.index)} campus listings")
+    except Exception as e:
+        print(f"[WARNING] Could not start campus_sellers.json watcher: {e}")
+    await realtime.start()
+    await gemini_http.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
+    for task in list(_refinement_tasks) + list(_index_tasks):
+        task.cancel()
+    await gemini_http.close()
+    parse_cache.close()
+    await realtime.close()
+    await catalog_watcher.stop()
     await close_db()
+    shutdown_password_pool()
 
 
 @app.get("/health")
@@ -2056,41 +2320,68 @@ async def health() -> Dict[str, Any]:
         "modelLoaded": MODEL_PATH.name,
         "profiles": len(seller_profiles),
         "requests": len(flash_requests),
+        "realtime": realtime.stats(),
+        "inboxCache": inbox_cache.stats(),
+        "gemini": {
+            **gemini_http.stats(),
+            "breaker": gemini_breaker.stats(),
+            "limiter": gemini_limiter.stats(),
+        },
+        "parseCache": parse_cache.stats(),
+        "auth": {"tokenCache": token_cache.stats()},
     }
 
 
+# Background Gemini refinements, referenced until they finish
+_refinement_tasks: Set[asyncio.Task] = set()
+
+
+def with_match_version(payload: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+    """Tag a flash request response with which parse its matches came from."""
+    payload["matchVersion"] = record.get("match_version", 1)
+    payload["refinementPending"] = record.get("refinement_pending", False)
+    payload["parser"] = record.get("parser", "gemini")
+    return payload
+
+
+async def refine_flash_request(request_id: str) -> None:
+    """Re-parse a flash request with Gemini and replace its provisional matches."""
+    record = flash_requests.get(request_id)
+    if not record:
+        return
+    try:
+        parsed = await call_gemini_parser("/api/parse-request", {"text": record["raw_text"]})
+        refined = {**record, "parsed_request": apply_request_metadata(parsed, record.get("metadata"))}
+        result = await build_match_payload(request_id, refined)
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else e
+        print(f"[WARNING] Could not refine flash request {request_id}: {detail}, keeping local parse")
+        record["refinement_pending"] = False
+        if record.get("match_payload"):
+            with_match_version(record["match_payload"], record)
+        return
+
+    record["parsed_request"] = refined["parsed_request"]
+    record["parser"] = "gemini"
+    record["match_version"] = record.get("match_version", 1) + 1
+    record["refinement_pending"] = False
+    record["match_payload"] = with_match_version(result, record)
+    print(f"[OK] Refined flash request {request_id} (match version {record['match_version']})")
+
+
 @app.post("/api/flash-requests")
-async def create_flash_request(payload: FlashRequestCreate) -> Dict[str, Any]:
+async def create_flash_request(
+    payload: FlashRequestCreate, owner_id: Optional[str] = Depends(token_user_id)
+) -> Dict[str, Any]:
     try:
         if not payload.text or not payload.text.strip():
             raise HTTPException(status_code=400, detail="Flash request text cannot be empty.")
 
-        # Try to parse with Gemini service, but handle errors gracefully
-        try:
-            parsed = await call_gemini_parser("/api/parse-request", {"text": payload.text})
-        except HTTPException as e:
-            # If Gemini service fails, create a basic parsed request
-            print(f"[WARNING] Gemini parser failed: {e.detail}, using fallback parsing")
-            parsed = {
-                "item_meta": {
-                    "category": payload.metadata.get("category") if payload.metadata else "Other",
-                },
-                "context": {},
-                "location": {},
-                "transaction": {},
-            }
-        except Exception as e:
-            # Generic error handling for Gemini service
-            print(f"[WARNING] Gemini parser error: {e}, using fallback parsing")
-            parsed = {
-                "item_meta": {
-                    "category": payload.metadata.get("category") if payload.metadata else "Other",
-                },
-                "context": {},
-                "location": {},
-                "transaction": {},
-            }
-        
+        # A cached Gemini parse is used as is; otherwise answer right away from
+        # the local parser and refine with Gemini in the background
+        gemini_parse = await parse_cache.get("/api/parse-request", {"text": payload.text})
+        refinement_pending = gemini_parse is None
+        parsed = gemini_parse if gemini_parse is not None else parse_request_locally(payload.text, fallback_category=infer_category_from_tokens)
         parsed = apply_request_metadata(parsed, payload.metadata)
 
         request_id = str(uuid.uuid4())
@@ -2100,8 +2391,12 @@ async def create_flash_request(payload: FlashRequestCreate) -> Dict[str, Any]:
             "id": request_id,
             "raw_text": payload.text,
             "parsed_request": parsed,
+            "owner_id": owner_id,  # only the owner may ping matches
             "created_at": datetime.utcnow().isoformat(),
             "metadata": payload.metadata or {},
+            "parser": "local" if refinement_pending else "gemini",
+            "match_version": 1,
+            "refinement_pending": refinement_pending,
         }
         
         # Verify the request was stored
@@ -2122,6 +2417,7 @@ async def create_flash_request(payload: FlashRequestCreate) -> Dict[str, Any]:
                 print(f"[ERROR] Flash request {request_id} was lost after building matches!")
             else:
                 print(f"[OK] Flash request {request_id} verified in memory after building matches")
+                flash_requests[request_id]["match_payload"] = with_match_version(result, flash_requests[request_id])
             return result
         except Exception as e:
             import traceback
@@ -2131,7 +2427,7 @@ async def create_flash_request(payload: FlashRequestCreate) -> Dict[str, Any]:
             if request_id not in flash_requests:
                 print(f"[ERROR] Flash request {request_id} was lost after matching failure!")
             # Return a basic response even if matching fails, but ensure request is stored
-            return {
+            return with_match_version({
                 "success": True,
                 "requestId": request_id,
                 "request": parsed,
@@ -2140,7 +2436,12 @@ async def create_flash_request(payload: FlashRequestCreate) -> Dict[str, Any]:
                     "error": str(e),
                     "generatedAt": datetime.utcnow().isoformat(),
                 },
-            }
+            }, flash_requests[request_id])
+        finally:
+            if refinement_pending and request_id in flash_requests:
+                task = asyncio.create_task(refine_flash_request(request_id))
+                _refinement_tasks.add(task)
+                task.add_done_callback(_refinement_tasks.discard)
     except HTTPException:
         # Re-raise HTTP exceptions (they already have proper error messages)
         raise
@@ -2160,12 +2461,12 @@ async def get_flash_request(request_id: str) -> Dict[str, Any]:
     record = flash_requests.get(request_id)
     if not record:
         raise HTTPException(status_code=404, detail="Flash request not found.")
-    return {
+    return with_match_version({
         "success": True,
         "requestId": request_id,
         "request": record["parsed_request"],
         "metadata": record.get("metadata"),
-    }
+    }, record)
 
 
 @app.get("/api/flash-requests/{request_id}/matches")
@@ -2196,6 +2497,10 @@ async def get_flash_request_matches(request_id: str) -> Dict[str, Any]:
                     detail=f"Flash request with ID '{request_id}' not found. Available requests: {len(flash_requests)}"
                 )
         
+        # Matches stored by create/refinement carry their version
+        if record.get("match_payload"):
+            return record["match_payload"]
+
         # Try to build match payload, but handle errors gracefully
         try:
             return await build_match_payload(request_id, record)
@@ -2255,6 +2560,99 @@ async def create_seller_profile(payload: SellerProfileCreate) -> Dict[str, Any]:
     }
 
 
+async def ingest_profile_batch(batch: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> int:
+    try:
+        results = await call_gemini_parser_batch(
+            "/api/parse-profile",
+            [{"text": entry["text"], "userId": entry["userId"]} for entry in batch],
+            priority=PRIORITY_BULK,
+        )
+    except HTTPException as exc:
+        results = [{"ok": False, "error": exc.detail}] * len(batch)
+
+    ingested = 0
+    created_at = datetime.utcnow().isoformat()
+    for entry, result in zip(batch, results):
+        if not result["ok"]:
+            errors.append({"line": entry["line"], "userId": entry["userId"], "error": result["error"]})
+            continue
+        parsed_profile = result["data"]
+        representative_item = build_representative_item(parsed_profile)
+        seller_profiles[entry["userId"]] = {
+            "user_id": entry["userId"],
+            "raw_text": entry["text"],
+            "parsed_profile": parsed_profile,
+            "representative_item": representative_item,
+            "seller_block": encoder.encode_seller_block(parsed_profile, representative_item),
+            "created_at": created_at,
+            "source": "bulk",
+            "metadata": entry["metadata"],
+        }
+        SELLER_KEYWORD_INDEX[entry["userId"]] = seller_keyword_tokens(
+            entry["text"], parsed_profile, representative_item
+        )
+        ingested += 1
+    return ingested
+
+
+@app.post("/api/profiles/bulk")
+async def bulk_create_seller_profiles(request: Request) -> Dict[str, Any]:
+    """
+    Ingest seller profiles from an NDJSON body, one
+    ``{"userId", "text", "metadata"?}`` object per line.
+
+    Lines are parsed through the Gemini batch route
+    ``PROFILE_INGEST_BATCH_SIZE`` at a time while the body is still
+    streaming in; seller-side features and keyword tokens are computed
+    once here instead of on every match.
+    """
+    batch: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    ingested = 0
+    line_number = 0
+    buffer = b""
+
+    async def lines():
+        nonlocal buffer
+        async for chunk in request.stream():
+            buffer += chunk
+            *complete, buffer = buffer.split(b"\n")
+            for line in complete:
+                yield line
+        if buffer:
+            yield buffer
+
+    async for raw_line in lines():
+        line_number += 1
+        if not raw_line.strip():
+            continue
+        try:
+            entry = json.loads(raw_line)
+            user_id = str(entry.get("userId") or "").strip()
+            text = str(entry.get("text") or "").strip()
+        except (ValueError, AttributeError):
+            errors.append({"line": line_number, "error": "Invalid JSON object"})
+            continue
+        if not user_id or not text:
+            errors.append({"line": line_number, "userId": user_id or None, "error": "Missing 'userId' or 'text'"})
+            continue
+        batch.append({"line": line_number, "userId": user_id, "text": text, "metadata": entry.get("metadata") or {}})
+        if len(batch) >= PROFILE_INGEST_BATCH_SIZE:
+            ingested += await ingest_profile_batch(batch, errors)
+            batch = []
+    if batch:
+        ingested += await ingest_profile_batch(batch, errors)
+
+    print(f"[OK] Bulk profile ingestion: {ingested} ingested, {len(errors)} failed")
+    return {
+        "success": True,
+        "ingested": ingested,
+        "failed": len(errors),
+        "errors": errors[:PROFILE_INGEST_MAX_ERRORS],
+        "totalProfiles": len(seller_profiles),
+    }
+
+
 @app.get("/api/profiles")
 async def list_profiles() -> Dict[str, Any]:
     summaries = [
@@ -2285,114 +2683,215 @@ async def seed_profiles(limit: int = 150) -> Dict[str, Any]:
 
 
 @app.post("/api/flash-requests/{request_id}/pings")
-async def send_pings(request_id: str, payload: PingMatchesRequest) -> Dict[str, Any]:
+async def send_pings(
+    request_id: str, payload: PingMatchesRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Notify matched sellers about a flash request.
+
+    Only the user who created the request may ping, and only sellers
+    among its stored matches; a broadcast without ``matchIds`` goes to
+    all of them.
+    """
     record = flash_requests.get(request_id)
     if not record:
         raise HTTPException(status_code=404, detail="Flash request not found.")
+    if not record.get("owner_id") or record["owner_id"] != str(current_user["_id"]):
+        raise HTTPException(status_code=403, detail="Only the requester can ping matches.")
+
+    matched_ids = [
+        match["user"]["id"]
+        for match in (record.get("match_payload") or {}).get("matches") or []
+        if (match.get("user") or {}).get("id")
+    ]
+    unknown = [match_id for match_id in payload.matchIds if match_id not in matched_ids]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Not matches for this request: {unknown}")
+    if payload.matchIds:
+        targets = list(dict.fromkeys(payload.matchIds))
+    elif payload.broadcastType:
+        targets = matched_ids
+    else:
+        targets = []
+
     entry = {
-        "matchIds": payload.matchIds,
+        "matchIds": targets,
         "broadcastType": payload.broadcastType,
         "timestamp": datetime.utcnow().isoformat(),
     }
     record.setdefault("pings", []).append(entry)
+
+    event = {
+        "type": "ping",
+        "requestId": request_id,
+        "text": record.get("raw_text", ""),
+        "broadcastType": payload.broadcastType,
+        "timestamp": entry["timestamp"],
+    }
+    for match_id in targets:
+        await realtime.publish_to_user(match_id, event)
+
     return {
         "success": True,
-        "pinged": len(payload.matchIds),
+        "pinged": len(targets),
         "broadcastType": payload.broadcastType,
     }
 
 
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket) -> None:
+    """
+    Push channel for new messages and match pings.
+
+    Browsers cannot set headers on a WebSocket handshake, so the JWT is
+    accepted from the ``token`` query parameter as well as the usual
+    ``Authorization: Bearer`` header.
+    """
+    token = websocket.query_params.get("token") or bearer_token(websocket.headers.get("Authorization"))
+    user_id = token_subject(token)
+    if not user_id:
+        if token:
+            print("[WARNING] WebSocket auth failed: invalid or expired token")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    client = realtime.connect(user_id, websocket)
+    print(f"[OK] WebSocket connected for {user_id}")
+    try:
+        await client.run()
+    finally:
+        realtime.disconnect(client)
+        print(f"[OK] WebSocket disconnected for {user_id}")
+
+
 @app.get("/api/messages")
-async def get_messages(request: Request) -> Dict[str, Any]:
+async def get_messages(user_id: str = Depends(resolve_caller)) -> Dict[str, Any]:
     """
     Get all message threads for the current user from MongoDB.
     """
     try:
-        # Try to get current user from auth token
-        user_id = None
-        try:
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-                payload = verify_token(token)
-                user_id = payload.get("sub")
-        except:
-            pass
-        
-        # If no auth token, try to get from query param or use default
-        if not user_id:
-            user_id = request.query_params.get("current_user") or "current_user"
+        cached_threads = inbox_cache.get(user_id)
+        if cached_threads is not None:
+            return {
+                "success": True,
+                "threads": cached_threads,
+            }
+        cache_ticket = inbox_cache.begin(user_id)
         
         # Get database connection
         db = get_db()
         
         # Find all threads where current user is a participant (from MongoDB)
-        user_thread_list = []
-        
-        # Query MongoDB for threads where user is participant1 or participant2
-        threads_cursor = db.message_threads.find({
+        thread_docs = await db.message_threads.find({
             "$or": [
                 {"participant1_id": user_id},
                 {"participant2_id": user_id}
             ]
-        }).sort("updated_at", -1)
-        
-        async for thread_doc in threads_cursor:
+        }).sort("updated_at", -1).to_list(length=None)
+
+        # Resolve the other participant of every thread
+        other_user_ids: Dict[str, str] = {}
+        for thread_doc in thread_docs:
             thread_id = thread_doc.get("thread_id")
-            
-            # Determine the other user's ID
-            if thread_doc.get("participant1_id") == user_id:
-                other_user_id = thread_doc.get("participant2_id")
+            participant1_id = thread_doc.get("participant1_id")
+            participant2_id = thread_doc.get("participant2_id")
+            if participant1_id == user_id and participant2_id:
+                other_user_id = participant2_id
+            elif participant2_id == user_id and participant1_id:
+                other_user_id = participant1_id
             else:
-                other_user_id = thread_doc.get("participant1_id")
-            
-            # Use stored other_user_id if available, otherwise use the one we determined
-            stored_other_user_id = thread_doc.get("other_user_id")
-            if stored_other_user_id:
-                other_user_id = stored_other_user_id
-            
+                other_user_id = thread_doc.get("other_user_id")
             if not other_user_id:
                 print(f"[WARNING] Thread {thread_id} has no valid other_user_id, skipping")
                 continue
-            
-            # Get user name from thread document or fetch from database
-            user_name = thread_doc.get("other_user_name", "User")
-            try:
-                other_user = await db.users.find_one({"_id": ObjectId(other_user_id)})
-                if other_user and other_user.get("name"):
-                    user_name = other_user["name"]
-                    # Update thread document with fresh name
-                    await db.message_threads.update_one(
-                        {"thread_id": thread_id},
-                        {"$set": {"other_user_name": user_name, "other_user_id": other_user_id}}
-                    )
-            except Exception as e:
-                print(f"[WARNING] Could not fetch user name for {other_user_id}: {e}")
-            
-            # Get last message from MongoDB
-            last_message_doc = await db.messages.find_one(
-                {"thread_id": thread_id},
-                sort=[("timestamp", -1)]
-            )
-            
+            other_user_ids[thread_id] = other_user_id
+
+        # Threads carry a denormalized last-message summary; only documents written
+        # before it existed (no last_message_at field) need the messages collection
+        legacy_thread_ids = [
+            thread_doc.get("thread_id") for thread_doc in thread_docs
+            if "last_message_at" not in thread_doc and thread_doc.get("thread_id") in other_user_ids
+        ]
+
+        # Fetch every other user's name (and legacy threads' last messages) in
+        # batched queries instead of per-thread round trips
+        user_object_ids = [
+            ObjectId(other_id) for other_id in set(other_user_ids.values()) if ObjectId.is_valid(other_id)
+        ]
+        queries = [db.users.find(
+            {"_id": {"$in": user_object_ids}}, {"name": 1}
+        ).to_list(length=None)]
+        if legacy_thread_ids:
+            queries.append(db.messages.aggregate([
+                {"$match": {"thread_id": {"$in": legacy_thread_ids}}},
+                {"$sort": {"thread_id": 1, "timestamp": -1}},
+                {"$group": {
+                    "_id": "$thread_id",
+                    "text": {"$first": "$text"},
+                    "timestamp": {"$first": "$timestamp"},
+                }},
+            ]).to_list(length=None))
+        results = await asyncio.gather(*queries)
+        users = results[0]
+        last_messages = results[1] if legacy_thread_ids else []
+
+        user_names = {str(user["_id"]): user.get("name") for user in users if user.get("name")}
+        last_message_by_thread = {entry["_id"]: entry for entry in last_messages}
+
+        user_thread_list = []
+        name_updates = []
+        for thread_doc in thread_docs:
+            thread_id = thread_doc.get("thread_id")
+            other_user_id = other_user_ids.get(thread_id)
+            if not other_user_id:
+                continue
+
+            # The cached other_user_name describes the stored other_user_id; only
+            # refresh it for that user, and only when the name actually changed
+            stored_other_user_id = thread_doc.get("other_user_id")
+            describes_other = stored_other_user_id in (None, other_user_id)
+            cached_name = thread_doc.get("other_user_name") if describes_other else None
+            user_name = user_names.get(other_user_id) or cached_name or "User"
+            if describes_other and other_user_id in user_names and (
+                cached_name != user_name or stored_other_user_id is None
+            ):
+                name_updates.append(UpdateOne(
+                    {"thread_id": thread_id},
+                    {"$set": {"other_user_name": user_name, "other_user_id": other_user_id}}
+                ))
+
             last_message_text = "No messages"
             last_message_time = "No messages"
-            if last_message_doc:
-                last_message_text = last_message_doc.get("text", "No messages")
-                last_message_time = last_message_doc.get("timestamp", datetime.utcnow()).isoformat()
-            
-            thread_info = {
+            if "last_message_at" in thread_doc:
+                if thread_doc.get("last_message_at"):
+                    last_message_text = thread_doc.get("last_message_text") or ""
+                    last_message_time = thread_doc["last_message_at"].isoformat()
+            else:
+                last_message_doc = last_message_by_thread.get(thread_id)
+                if last_message_doc:
+                    last_message_text = last_message_doc.get("text", "No messages")
+                    last_message_time = (last_message_doc.get("timestamp") or datetime.utcnow()).isoformat()
+
+            user_thread_list.append({
                 "id": thread_id,
                 "userId": other_user_id,
                 "userName": user_name,
                 "lastMessage": last_message_text,
                 "lastMessageTime": last_message_time,
-                "unread": thread_doc.get("unread_count", 0),
+                "unread": (thread_doc.get("unread_counts") or {}).get(user_id, 0),
                 "avatar": "👤",
-            }
-            user_thread_list.append(thread_info)
-            print(f"[OK] Added thread {thread_id} for user {user_id}: other_user_id={other_user_id}, name={user_name}")
-        
+            })
+
+        if name_updates:
+            try:
+                await db.message_threads.bulk_write(name_updates, ordered=False)
+            except Exception as e:
+                print(f"[WARNING] Could not refresh cached thread names: {e}")
+
+        print(f"[OK] Loaded {len(user_thread_list)} threads for user {user_id}")
+        inbox_cache.set(user_id, user_thread_list, cache_ticket)
+
         return {
             "success": True,
             "threads": user_thread_list,
@@ -2408,49 +2907,30 @@ async def get_messages(request: Request) -> Dict[str, Any]:
 
 
 @app.get("/api/dm/{user_id}")
-async def get_dm_thread(user_id: str, request: Request) -> Dict[str, Any]:
+async def get_dm_thread(user_id: str, current_user_id: str = Depends(resolve_caller)) -> Dict[str, Any]:
     """
     Get existing direct message thread with a user from MongoDB.
     Returns 404 if thread doesn't exist.
     """
     try:
-        # Try to get current user from auth token
-        current_user_id = None
-        try:
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-                payload = verify_token(token)
-                current_user_id = payload.get("sub")
-        except:
-            pass
-        
-        # If no auth token, try to get from query param or use default
-        if not current_user_id:
-            current_user_id = request.query_params.get("current_user") or "current_user"
-        
         # Get database connection
         db = get_db()
         
-        # Look for existing thread between current user and target user in MongoDB
-        thread_doc = await db.message_threads.find_one({
-            "$or": [
-                {"participant1_id": current_user_id, "participant2_id": user_id},
-                {"participant1_id": user_id, "participant2_id": current_user_id}
-            ]
-        })
+        # Look up the thread between current user and target user by its pair key
+        thread_doc = await db.message_threads.find_one(
+            {"pair_key": dm_pair_key(current_user_id, user_id)},
+            {"thread_id": 1, "other_user_id": 1},
+        )
         
         if thread_doc:
             thread_id = thread_doc.get("thread_id")
-            # Verify that other_user_id matches the requested user_id
-            stored_other_user_id = thread_doc.get("other_user_id")
-            if stored_other_user_id and stored_other_user_id == user_id:
+            if thread_doc.get("other_user_id"):
                 print(f"[OK] Found existing thread {thread_id} for user_id {user_id}")
                 return {
                     "threadId": thread_id,
                     "userId": user_id,
                 }
-            elif not stored_other_user_id:
+            else:
                 # Thread exists but other_user_id not set, update it
                 await db.message_threads.update_one(
                     {"thread_id": thread_id},
@@ -2475,22 +2955,13 @@ async def get_dm_thread(user_id: str, request: Request) -> Dict[str, Any]:
 
 
 @app.post("/api/dm/{user_id}")
-async def create_dm_thread(user_id: str, request: Request) -> Dict[str, Any]:
+async def create_dm_thread(
+    user_id: str, request: Request, current_user_id: Optional[str] = Depends(token_user_id)
+) -> Dict[str, Any]:
     """
     Create a new direct message thread with a user and save to MongoDB.
     """
     try:
-        # Try to get current user from auth token
-        current_user_id = None
-        try:
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-                payload = verify_token(token)
-                current_user_id = payload.get("sub")
-        except:
-            pass
-        
         # Parse JSON body if present (might contain current_user_id)
         try:
             body = await request.json() if request.headers.get("content-type") == "application/json" else {}
@@ -2512,54 +2983,61 @@ async def create_dm_thread(user_id: str, request: Request) -> Dict[str, Any]:
         # Get database connection
         db = get_db()
         
-        # Check if thread already exists in MongoDB
-        # Convert to strings for consistent comparison
+        # Find or create the thread in one indexed upsert on the pair key.
+        # Ensure all IDs are strings for consistency
         current_user_id_str = str(current_user_id) if current_user_id else "current_user"
         user_id_str = str(user_id) if user_id else user_id
+        pair_key = dm_pair_key(current_user_id_str, user_id_str)
+        new_thread_id = str(uuid.uuid4())
+        now = datetime.utcnow()
+        try:
+            thread_doc = await db.message_threads.find_one_and_update(
+                {"pair_key": pair_key},
+                {"$setOnInsert": {
+                    "thread_id": new_thread_id,
+                    "pair_key": pair_key,
+                    "participant1_id": current_user_id_str,  # Store as string for consistency
+                    "participant2_id": user_id_str,  # Store as string for consistency
+                    "other_user_id": user_id_str,  # The target user (the seller)
+                    "other_user_name": "User",
+                    "created_at": now,
+                    "updated_at": now,
+                    "unread_counts": {},
+                    "last_message_text": None,
+                    "last_message_at": None,
+                    "last_sender_id": None,
+                }},
+                projection={"thread_id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Lost a race with a concurrent create for the same pair
+            thread_doc = await db.message_threads.find_one({"pair_key": pair_key}, {"thread_id": 1})
         
-        existing_thread = await db.message_threads.find_one({
-            "$or": [
-                {"participant1_id": current_user_id_str, "participant2_id": user_id_str},
-                {"participant1_id": user_id_str, "participant2_id": current_user_id_str}
-            ]
-        })
-        
-        if existing_thread:
-            thread_id = existing_thread.get("thread_id")
+        thread_id = thread_doc.get("thread_id")
+        if thread_id != new_thread_id:
             print(f"[OK] Thread already exists: {thread_id}")
             return {
                 "threadId": thread_id,
                 "userId": user_id,
             }
         
-        # Fetch user name from database for the target user (user_id)
+        # Cache the target user's name on the new thread
         other_user_name = "User"  # Default fallback
         try:
-            other_user = await db.users.find_one({"_id": ObjectId(user_id)})
+            other_user = await db.users.find_one({"_id": ObjectId(user_id)}, {"name": 1})
             if other_user and other_user.get("name"):
                 other_user_name = other_user["name"]
+                await db.message_threads.update_one(
+                    {"thread_id": thread_id}, {"$set": {"other_user_name": other_user_name}}
+                )
         except Exception as e:
             print(f"[WARNING] Could not fetch user name for {user_id}: {e}")
             # Continue with default name
-        
-        # Create new thread and save to MongoDB
-        # Ensure all IDs are strings for consistency
-        thread_id = str(uuid.uuid4())
-        current_user_id_str = str(current_user_id) if current_user_id else "current_user"
-        user_id_str = str(user_id) if user_id else user_id
-        
-        thread_doc = {
-            "thread_id": thread_id,
-            "participant1_id": current_user_id_str,  # Store as string for consistency
-            "participant2_id": user_id_str,  # Store as string for consistency
-            "other_user_id": user_id_str,  # The target user (the seller)
-            "other_user_name": other_user_name,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "unread_count": 0,
-        }
-        
-        await db.message_threads.insert_one(thread_doc)
+
+        # Invalidate once the thread is complete so the default name is never cached
+        await inbox_cache.invalidate(current_user_id_str, user_id_str)
         
         print(f"[OK] Created DM thread {thread_id} in MongoDB between current_user={current_user_id} and other_user={user_id} (name: {other_user_name})")
         print(f"[OK] Thread data: other_user_id={user_id}, other_user_name={other_user_name}")
@@ -2577,37 +3055,87 @@ async def create_dm_thread(user_id: str, request: Request) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+MESSAGE_PAGE_DEFAULT = 50
+MESSAGE_PAGE_MAX = 200
+# Messages fetched per cursor batch (and written per chunk) by the NDJSON export
+MESSAGE_EXPORT_BATCH_SIZE = int(os.getenv("MESSAGE_EXPORT_BATCH_SIZE", "500"))
+
+
+def unread_counter_field(user_id: str) -> Optional[str]:
+    """Path of a user's counter in a thread's ``unread_counts`` map (None if unusable as a key)."""
+    if not user_id or "." in user_id or user_id.startswith("$"):
+        return None
+    return f"unread_counts.{user_id}"
+
+
+def encode_message_cursor(msg_doc: Dict[str, Any]) -> str:
+    """Cursor for a message: its timestamp plus _id to break timestamp ties."""
+    return f"{msg_doc['timestamp'].isoformat()}_{msg_doc['_id']}"
+
+
+def decode_message_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        timestamp_text, message_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(timestamp_text), ObjectId(message_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Invalid message cursor: {cursor}")
+
+
 @app.get("/api/messages/{thread_id}")
-async def get_thread_messages(thread_id: str, request: Request) -> Dict[str, Any]:
+async def get_thread_messages(
+    thread_id: str,
+    current_user_id: str = Depends(resolve_caller),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = MESSAGE_PAGE_DEFAULT,
+) -> Dict[str, Any]:
     """
-    Get all messages for a thread from MongoDB.
+    Get one page of a thread's messages from MongoDB.
+
+    Without cursors this is the newest ``limit`` messages. ``before`` pages
+    back into older history and ``after`` fetches messages newer than a
+    cursor (e.g. the newest message the client already has). Messages in a
+    page are always returned oldest first; ``nextCursor`` continues in the
+    same direction and is null once there is nothing more to load.
     """
     try:
-        # Try to get current user from auth token
-        current_user_id = None
-        try:
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-                payload = verify_token(token)
-                current_user_id = payload.get("sub")
-        except:
-            pass
-        
-        # If no auth token, try to get from query param or use default
-        if not current_user_id:
-            current_user_id = request.query_params.get("current_user") or "current_user"
-        
         # Get database connection
         db = get_db()
         
-        # Load messages from MongoDB
-        messages_cursor = db.messages.find(
-            {"thread_id": thread_id}
-        ).sort("timestamp", 1)  # Sort by timestamp ascending (oldest first)
-        
+        if before and after:
+            raise HTTPException(status_code=400, detail="Use either 'before' or 'after', not both")
+        limit = max(1, min(limit, MESSAGE_PAGE_MAX))
+
+        # Keyset pagination on the (thread_id, timestamp, _id) index
+        query: Dict[str, Any] = {"thread_id": thread_id}
+        if after:
+            cursor_time, cursor_id = decode_message_cursor(after)
+            query["$or"] = [
+                {"timestamp": {"$gt": cursor_time}},
+                {"timestamp": cursor_time, "_id": {"$gt": cursor_id}},
+            ]
+            direction = 1
+        else:
+            if before:
+                cursor_time, cursor_id = decode_message_cursor(before)
+                query["$or"] = [
+                    {"timestamp": {"$lt": cursor_time}},
+                    {"timestamp": cursor_time, "_id": {"$lt": cursor_id}},
+                ]
+            direction = -1  # newest first
+
+        # Fetch one extra message to learn whether another page exists
+        page_docs = await db.messages.find(query).sort(
+            [("timestamp", direction), ("_id", direction)]
+        ).limit(limit + 1).to_list(length=limit + 1)
+        has_more = len(page_docs) > limit
+        page_docs = page_docs[:limit]
+        next_cursor = encode_message_cursor(page_docs[-1]) if has_more else None
+        if direction == -1:
+            page_docs.reverse()
+
         formatted_messages = []
-        async for msg_doc in messages_cursor:
+        for msg_doc in page_docs:
             sender_id = msg_doc.get("sender_id", "unknown")
             formatted_messages.append({
                 "id": str(msg_doc.get("_id", "")),
@@ -2615,6 +3143,7 @@ async def get_thread_messages(thread_id: str, request: Request) -> Dict[str, Any
                 "text": msg_doc.get("text", ""),
                 "timestamp": msg_doc.get("timestamp", datetime.utcnow()).isoformat(),
                 "isOwn": sender_id == current_user_id,
+                "cursor": encode_message_cursor(msg_doc),
             })
         
         print(f"[OK] Loaded {len(formatted_messages)} messages for thread {thread_id}")
@@ -2622,7 +3151,11 @@ async def get_thread_messages(thread_id: str, request: Request) -> Dict[str, Any
         return {
             "success": True,
             "messages": formatted_messages,
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[WARNING] Error getting thread messages: {e}")
         import traceback
@@ -2633,29 +3166,109 @@ async def get_thread_messages(thread_id: str, request: Request) -> Dict[str, Any
         }
 
 
+@app.get("/api/messages/{thread_id}/export")
+async def export_thread_messages(
+    thread_id: str, user_id: Optional[str] = Depends(token_user_id)
+) -> StreamingResponse:
+    """
+    Stream a thread's full history as NDJSON, oldest message first.
+
+    Only a participant holding a valid bearer token may export.  Messages
+    are read from a cursor in batches of ``MESSAGE_EXPORT_BATCH_SIZE`` and
+    written out batch by batch, so memory use does not grow with the
+    length of the thread.
+    """
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    try:
+        db = get_db()
+    except RuntimeError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection failed. Please check MongoDB connection."
+        )
+    thread_doc = await db.message_threads.find_one(
+        {"thread_id": thread_id}, {"participant1_id": 1, "participant2_id": 1}
+    )
+    if not thread_doc:
+        raise HTTPException(status_code=404, detail=f"Thread not found: {thread_id}")
+    if user_id not in (thread_doc.get("participant1_id"), thread_doc.get("participant2_id")):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a participant in this thread")
+
+    async def ndjson_lines():
+        cursor = db.messages.find(
+            {"thread_id": thread_id},
+            {"sender_id": 1, "receiver_id": 1, "text": 1, "timestamp": 1, "read": 1},
+        ).sort([("timestamp", 1), ("_id", 1)]).batch_size(MESSAGE_EXPORT_BATCH_SIZE)
+
+        chunk: List[str] = []
+        async for msg_doc in cursor:
+            timestamp = msg_doc.get("timestamp")
+            chunk.append(json.dumps({
+                "id": str(msg_doc["_id"]),
+                "threadId": thread_id,
+                "senderId": msg_doc.get("sender_id"),
+                "receiverId": msg_doc.get("receiver_id"),
+                "text": msg_doc.get("text", ""),
+                "timestamp": timestamp.isoformat() if timestamp else None,
+                "read": msg_doc.get("read", False),
+            }) + "\n")
+            if len(chunk) >= MESSAGE_EXPORT_BATCH_SIZE:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="thread-{thread_id}.ndjson"'},
+    )
+
+
+async def revert_thread_update(db, message_doc: Dict[str, Any], unread_field: Optional[str]) -> None:
+    """Undo a send's thread updates after its message insert failed."""
+    thread_id = message_doc["thread_id"]
+    previous = await db.messages.find_one(
+        {"thread_id": thread_id}, sort=[("timestamp", -1), ("_id", -1)]
+    )
+    summary: Dict[str, Any] = {
+        "last_message_text": previous["text"] if previous else None,
+        "last_message_at": previous["timestamp"] if previous else None,
+        "last_sender_id": previous["sender_id"] if previous else None,
+    }
+    if previous:
+        summary["updated_at"] = previous["timestamp"]
+    # Only while the summary still describes the failed message, not a newer send
+    await db.message_threads.update_one(
+        {
+            "thread_id": thread_id,
+            "last_message_at": message_doc["timestamp"],
+            "last_sender_id": message_doc["sender_id"],
+        },
+        {"$set": summary},
+    )
+    if unread_field:
+        await db.message_threads.update_one(
+            {"thread_id": thread_id},
+            [{"$set": {unread_field: {"$max": [0, {"$subtract": [
+                {"$ifNull": [f"${unread_field}", 0]}, 1
+            ]}]}}}],
+        )
+
+
 @app.post("/api/messages/{thread_id}")
 async def send_thread_message(
     thread_id: str, 
-    request: Request,
-    payload: MessageSendRequest = Body(...)
+    payload: MessageSendRequest = Body(...),
+    token_user: Optional[str] = Depends(token_user_id),
 ) -> Dict[str, Any]:
     """
     Send a message in a thread and save to MongoDB.
     """
     try:
         text = payload.text
-        sender_id = payload.senderId or "current_user"
-        
-        # Try to get current user from auth token
-        try:
-            auth_header = request.headers.get("Authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-                token_payload = verify_token(token)
-                sender_id = token_payload.get("sub") or sender_id
-        except Exception as auth_error:
-            print(f"[WARNING] Auth token verification failed (using senderId from payload): {auth_error}")
-            pass
+        sender_id = token_user or payload.senderId or "current_user"
         
         if not text or not text.strip():
             raise HTTPException(status_code=400, detail="Message text cannot be empty")
@@ -2664,29 +3277,17 @@ async def send_thread_message(
         
         # Get database connection
         db = get_db()
-        if not db:
+        if db is None:
             raise HTTPException(status_code=500, detail="Database connection failed")
         
-        # Verify thread exists
-        thread_doc = await db.message_threads.find_one({"thread_id": thread_id})
+        # Verify thread exists (only the participant fields are needed)
+        thread_doc = await db.message_threads.find_one(
+            {"thread_id": thread_id},
+            {"participant1_id": 1, "participant2_id": 1, "other_user_id": 1},
+        )
         if not thread_doc:
             print(f"[ERROR] Thread {thread_id} not found in database")
-            print(f"[DEBUG] Attempting to find thread by participants to recover...")
-            # Try to find thread by participants as a fallback
-            # This handles cases where thread_id might be different but participants match
-            fallback_thread = await db.message_threads.find_one({
-                "$or": [
-                    {"participant1_id": sender_id},
-                    {"participant2_id": sender_id}
-                ]
-            })
-            if fallback_thread:
-                thread_id = fallback_thread.get("thread_id")
-                thread_doc = fallback_thread
-                print(f"[OK] Found fallback thread: {thread_id}")
-            else:
-                # If thread truly doesn't exist, return 404
-                raise HTTPException(status_code=404, detail=f"Thread not found: {thread_id}. Please create a conversation first.")
+            raise HTTPException(status_code=404, detail=f"Thread not found: {thread_id}. Please create a conversation first.")
         
         # Determine receiver_id (the other participant)
         participant1_id = thread_doc.get("participant1_id")
@@ -2758,6 +3359,7 @@ async def send_thread_message(
         
         # Create message document
         message_doc = {
+            "_id": ObjectId(),
             "thread_id": thread_id,
             "sender_id": sender_id_str,  # Use string version for consistency
             "receiver_id": str(receiver_id).strip(),  # Ensure receiver_id is a string
@@ -2768,32 +3370,75 @@ async def send_thread_message(
         
         print(f"[DEBUG] Creating message document: thread_id={thread_id}, sender_id={sender_id_str}, receiver_id={receiver_id}, text_length={len(text)}")
         
-        # Save message to MongoDB
-        try:
-            result = await db.messages.insert_one(message_doc)
-            message_id = str(result.inserted_id)
-            print(f"[OK] Message inserted with ID: {message_id}")
-        except Exception as insert_error:
-            print(f"[ERROR] Failed to insert message: {insert_error}")
-            raise HTTPException(status_code=500, detail=f"Failed to save message: {str(insert_error)}")
-        
-        # Verify the message was actually saved by reading it back
-        saved_message = await db.messages.find_one({"_id": result.inserted_id})
-        if not saved_message:
-            print(f"[WARNING] Message {message_id} was not found immediately after insert!")
-        else:
-            print(f"[OK] Verified message {message_id} was saved to MongoDB")
-        
-        # Update thread's updated_at timestamp
-        await db.message_threads.update_one(
-            {"thread_id": thread_id},
-            {"$set": {"updated_at": datetime.utcnow()}}
+        message_id = str(message_doc["_id"])
+
+        # Thread updates go out as one bulk write: the last-message summary,
+        # guarded by timestamp so a slower, older send cannot overwrite a
+        # newer one, and the receiver's unread counter, which must count
+        # every message regardless of arrival order.
+        thread_updates = [
+            UpdateOne(
+                {
+                    "thread_id": thread_id,
+                    "$or": [
+                        {"last_message_at": None},
+                        {"last_message_at": {"$lte": message_doc["timestamp"]}},
+                    ],
+                },
+                {"$set": {
+                    "updated_at": message_doc["timestamp"],
+                    "last_message_text": message_doc["text"],
+                    "last_message_at": message_doc["timestamp"],
+                    "last_sender_id": sender_id_str,
+                }},
+            ),
+        ]
+        unread_field = unread_counter_field(message_doc["receiver_id"])
+        if unread_field:
+            thread_updates.append(UpdateOne({"thread_id": thread_id}, {"$inc": {unread_field: 1}}))
+
+        # The insert and the thread updates are independent, so issue them concurrently
+        insert_result, thread_result = await asyncio.gather(
+            db.messages.with_options(write_concern=MESSAGE_WRITE_CONCERN).insert_one(message_doc),
+            db.message_threads.with_options(write_concern=MESSAGE_WRITE_CONCERN).bulk_write(
+                thread_updates, ordered=False
+            ),
+            return_exceptions=True,
         )
+        if isinstance(insert_result, Exception):
+            print(f"[ERROR] Failed to insert message: {insert_result}")
+            if not isinstance(thread_result, Exception):
+                # Take back the summary and unread count written for the lost message
+                try:
+                    await revert_thread_update(db, message_doc, unread_field)
+                except Exception as e:
+                    print(f"[WARNING] Could not revert thread {thread_id} after failed send: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to save message: {str(insert_result)}")
+        if isinstance(thread_result, Exception):
+            # The message is saved; the thread summary catches up on the next send
+            print(f"[WARNING] Failed to update thread {thread_id} summary: {thread_result}")
         
         print(f"[OK] Saved message {message_id} to MongoDB for thread {thread_id}")
         print(f"[OK] From: {sender_id_str} -> To: {receiver_id}")
         print(f"[OK] Message text: {text[:50]}...")  # Log first 50 chars for debugging
-        
+
+        # Push to both sides so the sender's other tabs stay in sync too
+        event = {
+            "type": "message",
+            "threadId": thread_id,
+            "message": {
+                "id": message_id,
+                "senderId": sender_id_str,
+                "text": message_doc["text"],
+                "timestamp": message_doc["timestamp"].isoformat(),
+                "cursor": encode_message_cursor(message_doc),
+            },
+        }
+        # Invalidate before publishing: clients refetch the inbox on the event
+        await inbox_cache.invalidate(sender_id_str, message_doc["receiver_id"])
+        for user_id in {sender_id_str, message_doc["receiver_id"]}:
+            await realtime.publish_to_user(user_id, event)
+
         return {
             "success": True,
             "messageId": message_id,
@@ -2810,6 +3455,55 @@ async def send_thread_message(
         raise HTTPException(status_code=500, detail=f"Internal server error: {error_msg}")
 
 
+@app.post("/api/messages/{thread_id}/read")
+async def mark_thread_read(
+    thread_id: str,
+    payload: Optional[MarkReadRequest] = Body(default=None),
+    user_id: str = Depends(resolve_caller),
+) -> Dict[str, Any]:
+    """
+    Mark the current user's received messages in a thread as read.
+
+    Without ``upTo`` everything received so far is marked read; with a
+    message cursor only messages up to and including that one are.  The
+    unread counter drops by as many messages as were marked.
+    """
+    up_to = payload.upTo if payload else None
+    query: Dict[str, Any] = {"thread_id": thread_id, "receiver_id": user_id, "read": False}
+    if up_to:
+        cursor_time, cursor_id = decode_message_cursor(up_to)
+        query["$or"] = [
+            {"timestamp": {"$lt": cursor_time}},
+            {"timestamp": cursor_time, "_id": {"$lte": cursor_id}},
+        ]
+
+    try:
+        db = get_db()
+    except RuntimeError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database connection failed. Please check MongoDB connection."
+        )
+    result = await db.messages.update_many(query, {"$set": {"read": True}})
+
+    unread_field = unread_counter_field(user_id)
+    if unread_field and result.modified_count:
+        # One pipeline update, so a send's $inc landing alongside is never lost;
+        # the floor at 0 covers messages sent before counters existed
+        await db.message_threads.update_one(
+            {"thread_id": thread_id},
+            [{"$set": {unread_field: {"$max": [0, {"$subtract": [
+                {"$ifNull": [f"${unread_field}", 0]}, result.modified_count
+            ]}]}}}],
+        )
+    await inbox_cache.invalidate(user_id)
+
+    return {
+        "success": True,
+        "marked": result.modified_count,
+    }
+
+
 @app.get("/api/profiles/{user_id}/history")
 async def get_profile_history(user_id: str, cursor: Optional[int] = None) -> Dict[str, Any]:
     # Map new user_ids to old DEMO_PROFILE_HISTORY keys
@@ -2857,109 +3551,23 @@ async def get_profile_history(user_id: str, cursor: Optional[int] = None) -> Dic
 # Listings Endpoint
 # ============================================================================
 
-_campus_sellers_cache: Optional[List[Dict[str, Any]]] = None
-_campus_sellers_cache_time: Optional[float] = None
-
+catalog_watcher = CatalogWatcher(CAMPUS_SELLERS_PATH)
 
-def load_campus_sellers(use_cache: bool = True) -> List[Dict[str, Any]]:
-    """Load sellers from campus_sellers.json with caching."""
-    global _campus_sellers_cache, _campus_sellers_cache_time
-    
-    if use_cache and _campus_sellers_cache is not None:
-        # Check if file was modified (simple cache invalidation)
-        try:
-            mtime = CAMPUS_SELLERS_PATH.stat().st_mtime
-            if _campus_sellers_cache_time == mtime:
-                return _campus_sellers_cache
-        except OSError:
-            pass
-    
-    if not CAMPUS_SELLERS_PATH.exists():
-        return []
-    
-    try:
-        with open(CAMPUS_SELLERS_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            sellers = data.get("sellers", [])
-            _campus_sellers_cache = sellers
-            _campus_sellers_cache_time = CAMPUS_SELLERS_PATH.stat().st_mtime
-            return sellers
-    except (json.JSONDecodeError, OSError) as e:
-        print(f"Error loading campus_sellers.json: {e}")
-        return []
-
-
-def normalize_category(category: str) -> str:
-    """Normalize backend category to frontend category."""
-    if not category:
-        return "Other"
-    category_lower = category.lower().replace("_", " ")
-    if "textbook" in category_lower:
-        return "Textbooks"
-    elif "electronic" in category_lower:
-        return "Electronics"
-    elif "cloth" in category_lower:
-        return "Clothing"
-    elif "food" in category_lower or "snack" in category_lower:
-        return "Food"
-    elif "furniture" in category_lower or "furnish" in category_lower:
-        return "Furniture"
-    else:
-        return "Other"
-
-
-def get_category_emoji(category: str) -> str:
-    """Get emoji based on category."""
-    category_lower = category.lower()
-    if "textbook" in category_lower:
-        return "📚"
-    elif "electronic" in category_lower:
-        return "💻"
-    elif "cloth" in category_lower:
-        return "👕"
-    elif "food" in category_lower:
-        return "🍕"
-    elif "furniture" in category_lower:
-        return "🪑"
-    else:
-        return "📦"
 
-
-def calculate_seller_badges(seller: Dict[str, Any]) -> List[str]:
-    """Calculate badges for a seller based on their stats."""
-    badges = []
-    
-    # Verified Student - if seller has a rating, consider them verified
-    if seller.get("seller_rating_avg", 0) > 0:
-        badges.append("Verified Student")
-    
-    # Top Seller - if total items sold > 20
-    total_items_sold = sum(
-        s.get("total_items_sold", 0) 
-        for s in seller.get("sales_history_summary", [])
-    )
-    if total_items_sold > 20:
-        badges.append("Top Seller")
-    
-    # Campus Leader - if trust score > 90
-    # Calculate trust score: base 70 + up to 25 based on rating + items sold
-    rating = seller.get("seller_rating_avg", 0)
-    trust_score = min(95, 70 + min(15, (rating - 3) * 5) + min(10, total_items_sold // 5))
-    if trust_score > 90:
-        badges.append("Campus Leader")
-    
-    return badges
+def get_listing_catalog() -> ListingCatalog:
+    """Current campus_sellers.json snapshot; kept fresh by the background watcher."""
+    return catalog_watcher.current or catalog_watcher.load_now()
 
 
-def calculate_trust_score(seller: Dict[str, Any]) -> int:
-    """Calculate trust score for a seller."""
-    rating = seller.get("seller_rating_avg", 0)
-    total_items_sold = sum(
-        s.get("total_items_sold", 0) 
-        for s in seller.get("sales_history_summary", [])
-    )
-    # Base score 70, add up to 15 for rating, up to 10 for volume
-    return min(95, 70 + min(15, int((rating - 3) * 5)) + min(10, total_items_sold // 5))
+@app.get("/api/listings/suggest")
+async def suggest_listings(q: str = "", limit: int = 8) -> Dict[str, Any]:
+    """Typeahead suggestions over listing titles, categories and seller names."""
+    suggestions = get_listing_catalog().suggester.suggest(q, limit=max(0, min(limit, 25)))
+    return {
+        "success": True,
+        "query": q,
+        "suggestions": suggestions,
+    }
 
 
 @app.get("/api/listings")
@@ -2968,154 +3576,49 @@ async def get_listings(
     category: Optional[str] = None,
     priceMax: Optional[float] = None,
     verifiedOnly: Optional[bool] = None,
+    facets: Optional[bool] = None,
 ) -> Dict[str, Any]:
-    """Get listings from campus_sellers.json with filtering."""
-    sellers = load_campus_sellers(use_cache=True)
-    
-    all_listings = []
-    
-    # Extract all listings from all sellers
-    for seller in sellers:
-        seller_listings = seller.get("current_item_listings", [])
-        if not seller_listings:
-            continue
-        
-        # Calculate seller stats
-        total_items_sold = sum(
-            s.get("total_items_sold", 0) 
-            for s in seller.get("sales_history_summary", [])
-        )
-        seller_rating = seller.get("seller_rating_avg", 0)
-        badges = calculate_seller_badges(seller)
-        trust_score = calculate_trust_score(seller)
-        verified = seller_rating > 0
-        
-        # Get seller location
-        location_keywords = seller.get("inferred_location_keywords", [])
-        seller_location = location_keywords[0] if location_keywords else "Campus"
-        
-        # Create listing for each item
-        for listing_index, listing in enumerate(seller_listings):
-            # Generate unique ID
-            listing_id = f"{seller.get('user_id', 'unknown')}-{listing.get('parsed_item', 'item')}-{listing_index}-{listing.get('date_posted', '')}"
-            
-            # Normalize category
-            normalized_category = normalize_category(listing.get("category", "Other"))
-            
-            # Get location - use listing location if available, else seller location
-            listing_location = listing.get("location", "") or seller_location
-            
-            # Format price
-            price = listing.get("price", 0)
-            price_str = f"${int(price)}" if price else "$0"
-            
-            # Format listing
-            formatted_listing = {
-                "id": listing_id,
-                "title": listing.get("parsed_item", "Item"),
-                "category": normalized_category,
-                "price": price_str,
-                "photo": get_category_emoji(listing.get("category", "Other")),
-                "condition": listing.get("condition", ""),
-                "description": listing.get("description", ""),
-                "location": listing_location,
-                "lastActive": listing.get("date_posted", ""),
-                "owner": {
-                    "id": seller.get("user_id", ""),
-                    "name": seller.get("full_name", "Unknown Seller"),
-                    "major": seller.get("inferred_major", "Undeclared"),
-                    "dorm": seller_location,
-                    "rating": round(seller_rating, 2) if seller_rating else 0.0,
-                    "verified": verified,
-                    "trustScore": trust_score,
-                    "pastTrades": total_items_sold,
-                    "badges": badges,
-                },
-            }
-            
-            all_listings.append(formatted_listing)
-    
-    # Apply filters
-    filtered_listings = all_listings
-    
-    # Search filter
-    if search:
-        search_lower = search.lower()
-        filtered_listings = [
-            l for l in filtered_listings
-            if search_lower in l["title"].lower() 
-            or search_lower in l.get("description", "").lower()
-            or search_lower in l.get("condition", "").lower()
-        ]
-    
-    # Category filter
-    if category and category != "All":
-        filtered_listings = [
-            l for l in filtered_listings
-            if l["category"] == category
-        ]
-    
-    # Price filter
-    if priceMax is not None:
-        filtered_listings = [
-            l for l in filtered_listings
-            if float(l["price"].replace("$", "").replace(",", "")) <= priceMax
-        ]
-    
-    # Verified filter
-    if verifiedOnly:
-        filtered_listings = [
-            l for l in filtered_listings
-            if l["owner"]["verified"]
-        ]
-    
-    # Sort by date_posted (newest first)
-    filtered_listings.sort(
-        key=lambda x: x.get("lastActive", ""),
-        reverse=True
+    """Get listings from campus_sellers.json with filtering and optional facet counts."""
+    catalog = get_listing_catalog()
+    index = catalog.index
+    masks = index.filter_masks(
+        search=search,
+        category=category,
+        price_max=priceMax,
+        verified_only=verifiedOnly,
     )
-    
-    return {
+    exact_mask = index.combine(masks)
+    selected = index.rows(exact_mask)
+
+    # Fall back to typo-tolerant matching ("calculater", "mini frige") when exact search is thin
+    fuzzy_count = 0
+    if search and len(selected) < FUZZY_SEARCH_MIN_RESULTS:
+        fuzzy_mask, fuzzy_score = catalog.trigrams.search(search)
+        fuzzy_rows = index.rows(fuzzy_mask & index.combine(masks, exclude="search") & ~exact_mask)
+        fuzzy_rows = fuzzy_rows[np.argsort(-fuzzy_score[fuzzy_rows], kind="stable")]
+        fuzzy_count = len(fuzzy_rows)
+        selected = np.concatenate([selected, fuzzy_rows])
+        # Facets count the rows actually returned: exact or fuzzy search matches
+        masks["search"] = masks["search"] | fuzzy_mask
+
+    filtered_listings = [index.to_dict(int(row)) for row in selected]
+
+    response: Dict[str, Any] = {
         "success": True,
         "listings": filtered_listings,
         "total": len(filtered_listings),
     }
+    if search:
+        response["fuzzyMatches"] = fuzzy_count
+    if facets:
+        response["facets"] = index.facets(masks)
+    return response
 
 
 # ============================================================================
 # Authentication Endpoints
 # ============================================================================
 
-security = HTTPBearer()
-
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from JWT token."""
-    token = credentials.credentials
-    try:
-        payload = verify_token(token)
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials"
-            )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=str(e)
-        )
-    
-    db = get_db()
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return user
-
-
 @app.post("/api/auth/register")
 async def register(user_data: UserCreate) -> Dict[str, Any]:
     """Register a new user with bio processing."""
@@ -3136,7 +3639,7 @@ async def register(user_data: UserCreate) -> Dict[str, Any]:
         )
     
     # Hash password
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     
     # Create user document
     user_doc = {
@@ -3166,7 +3669,8 @@ async def register(user_data: UserCreate) -> Dict[str, Any]:
     try:
         parsed_profile = await call_gemini_parser(
             "/api/parse-profile",
-            {"text": user_data.bio, "userId": user_id}
+            {"text": user_data.bio, "userId": user_id},
+            priority=PRIORITY_BACKGROUND,
         )
         
         print(f"[OK] Successfully parsed profile for user {user_id}")
@@ -3276,11 +3780,22 @@ async def login(login_data: LoginRequest) -> Dict[str, Any]:
         )
     
     # Verify password
-    if not verify_password(login_data.password, user["password"]):
+    if not await verify_password_async(login_data.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
+
+    # Bring a weaker stored hash up to BCRYPT_ROUNDS while we have the password
+    if password_needs_rehash(user["password"]):
+        try:
+            await db.users.update_one(
+                {"_id": user["_id"]},
+                {"$set": {"password": await hash_password_async(login_data.password)}},
+            )
+        except Exception as e:
+            # The old hash still works; try again on the next login
+            print(f"[WARNING] Could not rehash password for user {user['_id']}: {e}")
     
     # Create access token
     access_token = create_access_token(data={"sub": str(user["_id"])})
@@ -3449,14 +3964,12 @@ class ProcessBioRequest(BaseModel):
     bio: str
 
 
-class MessageSendRequest(BaseModel):
-    text: str
-    senderId: Optional[str] = None
-
-
 @app.post("/api/seller-profiles/process-bio")
-async def process_bio(request: ProcessBioRequest) -> Dict[str, Any]:
-    """Process a bio using LLM and create/update seller profile."""
+async def process_bio(
+    request: ProcessBioRequest, current_user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Process the caller's bio using LLM and create/update their seller profile."""
+    user_id = str(current_user["_id"])
     if not request.bio.strip():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -3466,17 +3979,17 @@ async def process_bio(request: ProcessBioRequest) -> Dict[str, Any]:
     # Process bio with LLM
     parsed_profile = await call_gemini_parser(
         "/api/parse-profile",
-        {"text": request.bio, "userId": request.userId}
+        {"text": request.bio, "userId": user_id}
     )
     
     db = get_db()
     
     # Check if seller profile already exists
-    existing_profile = await db.seller_profiles.find_one({"user_id": request.userId})
+    existing_profile = await db.seller_profiles.find_one({"user_id": user_id})
     
     seller_profile_doc = {
         "schema_type": "SELLER_PROFILE",
-        "user_id": request.userId,
+        "user_id": user_id,
         "context": parsed_profile.get("context", {"original_text": request.bio}),
         "profile_keywords": parsed_profile.get("profile_keywords", []),
         "inferred_major": parsed_profile.get("inferred_major"),
@@ -3490,7 +4003,7 @@ async def process_bio(request: ProcessBioRequest) -> Dict[str, Any]:
     if existing_profile:
         # Update existing profile
         await db.seller_profiles.update_one(
-            {"user_id": request.userId},
+            {"user_id": user_id},
             {"$set": seller_profile_doc}
         )
         seller_profile_doc["_id"] = existing_profile["_id"]
@@ -3502,7 +4015,7 @@ async def process_bio(request: ProcessBioRequest) -> Dict[str, Any]:
         
         # Update user with seller profile reference
         await db.users.update_one(
-            {"_id": ObjectId(request.userId)},
+            {"_id": ObjectId(user_id)},
             {"$set": {"seller_profile_id": seller_profile_doc["_id"], "updated_at": datetime.utcnow()}}
         )
     
@@ -3645,7 +4158,7 @@ async def seed_default_profiles() -> Dict[str, Any]:
             continue
         
         # Hash password
-        hashed_password = hash_password(profile_data["password"])
+        hashed_password = await hash_password_async(profile_data["password"])
         
         # Create user document
         user_doc = {
@@ -1,18 +1,48 @@
 """Authentication utilities."""
+import asyncio
 import bcrypt
 import jwt
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 import os
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
+# bcrypt work factor; each +1 doubles hashing time (12 is ~250ms on one core)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads for hashing off the event loop; bcrypt releases the GIL, so this bounds CPU use
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Verified tokens kept so repeat requests skip the HMAC check and JSON decode
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+
+_password_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ThreadPoolExecutor(
+            max_workers=max(1, PASSWORD_HASH_WORKERS), thread_name_prefix="bcrypt"
+        )
+    return _password_pool
+
+
+def shutdown_password_pool() -> None:
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -25,6 +55,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     )
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash was made with fewer than BCRYPT_ROUNDS rounds."""
+    try:
+        return int(hashed_password.split("$")[2]) < BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+
+async def hash_password_async(password: str) -> str:
+    """``hash_password`` on the bcrypt pool, so the event loop keeps serving."""
+    return await asyncio.get_running_loop().run_in_executor(_pool(), hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` on the bcrypt pool, so the event loop keeps serving."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _pool(), verify_password, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -44,6 +94,54 @@ def verify_token(token: str):
         return payload
     except jwt.ExpiredSignatureError:
         raise ValueError("Token has expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise ValueError("Invalid token")
 
+
+class TokenCache:
+    """
+    Bounded LRU of token -> verified claims.
+
+    An entry is only served until the token's own ``exp``, so a cached
+    token expires exactly when ``verify_token`` would start rejecting it.
+    Tokens without ``exp`` are never cached.
+    """
+
+    def __init__(self, max_entries: int = AUTH_TOKEN_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        ``verify_token`` with caching; raises ValueError like it does.
+
+        Returns a copy of the claims so callers cannot alter the cached entry.
+        """
+        entry = self._entries.get(token)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return dict(entry[1])
+            del self._entries[token]
+
+        self.misses += 1
+        payload = verify_token(token)
+        expires_at = payload.get("exp")
+        if self.max_entries > 0 and isinstance(expires_at, (int, float)):
+            self._entries[token] = (float(expires_at), payload)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return dict(payload)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
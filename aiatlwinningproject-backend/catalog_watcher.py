@@ -0,0 +1,152 @@
+"""Background loading and hot-swapping of the campus_sellers.json listing catalog."""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from listing_index import ListingIndex
+from search_index import PrefixSuggester, TrigramIndex
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+try:
+    from watchfiles import awatch
+except ImportError:  # pragma: no cover - falls back to polling
+    awatch = None
+
+POLL_INTERVAL_SECONDS = float(os.getenv("CAMPUS_SELLERS_POLL_SECONDS", "2.0"))
+
+
+def parse_json_bytes(raw: bytes) -> Any:
+    """Decode JSON with orjson when installed, otherwise the stdlib parser."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class ListingCatalog:
+    """
+    Immutable snapshot of campus_sellers.json and every index derived from it.
+
+    Request handlers grab one catalog reference and use its index,
+    suggester and trigram index together, so a reload can never mix
+    structures built from different versions of the file.
+    """
+
+    def __init__(self, sellers: List[Dict[str, Any]], mtime: Optional[float] = None) -> None:
+        self.sellers = sellers
+        self.mtime = mtime
+        self.index = ListingIndex(sellers)
+        self.suggester = PrefixSuggester.from_listing_index(self.index)
+        self.trigrams = TrigramIndex.from_listing_index(self.index)
+
+
+def build_catalog(path: Path) -> ListingCatalog:
+    """Read, parse and index ``path``; raises OSError/ValueError if it cannot be read."""
+    mtime = path.stat().st_mtime
+    data = parse_json_bytes(path.read_bytes())
+    return ListingCatalog(data.get("sellers", []), mtime=mtime)
+
+
+class CatalogWatcher:
+    """
+    Keeps ``current`` in sync with a JSON file without blocking requests.
+
+    Changes are detected with inotify (via ``watchfiles``) when available
+    and by polling the file's mtime otherwise.  Parsing and index
+    building run in a worker thread; the finished catalog replaces
+    ``current`` with a single reference assignment.
+    """
+
+    def __init__(self, path: Path, poll_interval: float = POLL_INTERVAL_SECONDS) -> None:
+        self.path = path
+        self.poll_interval = poll_interval
+        self.current: Optional[ListingCatalog] = None
+        self.reloads = 0
+        self._failed_mtime: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def load_now(self) -> ListingCatalog:
+        """Synchronously build the catalog (used before the watcher has started)."""
+        if self.current is None:
+            try:
+                self.current = build_catalog(self.path)
+            except (OSError, ValueError) as e:
+                print(f"Error loading {self.path.name}: {e}")
+                self.current = ListingCatalog([])
+        return self.current
+
+    async def reload(self) -> ListingCatalog:
+        """Rebuild the catalog off the event loop and swap it in."""
+        loop = asyncio.get_running_loop()
+        catalog = await loop.run_in_executor(None, build_catalog, self.path)
+        self.current = catalog
+        self.reloads += 1
+        return catalog
+
+    async def start(self) -> None:
+        """Load the initial catalog and start watching for changes."""
+        if self.current is None:
+            try:
+                await self.reload()
+            except (OSError, ValueError) as e:
+                print(f"Error loading {self.path.name}: {e}")
+                self.current = ListingCatalog([])
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        if awatch is not None:
+            try:
+                await self._watch_events()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[WARNING] File watcher unavailable for {self.path.name} ({e}), polling instead")
+        await self._watch_polling()
+
+    async def _watch_events(self) -> None:
+        target = str(self.path.resolve())
+        # Watch the directory so editors that replace the file (rename-over) are seen too
+        async for changes in awatch(self.path.parent, recursive=False):
+            if any(str(Path(changed).resolve()) == target for _, changed in changes):
+                await self._reload_if_changed()
+
+    async def _watch_polling(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            await self._reload_if_changed()
+
+    async def _reload_if_changed(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self._failed_mtime:
+            return
+        if self.current is not None and mtime == self.current.mtime:
+            return
+        # A failed reload (e.g. a half-written file) keeps serving the previous catalog
+        try:
+            catalog = await self.reload()
+            self._failed_mtime = None
+            print(f"[OK] Reloaded {self.path.name}: {len(catalog.index)} listings")
+        except Exception as e:
+            self._failed_mtime = mtime
+            print(f"[WARNING] Failed to reload {self.path.name}, keeping previous catalog: {e}")
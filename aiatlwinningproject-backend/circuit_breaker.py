@@ -0,0 +1,152 @@
+"""Circuit breaker for calls to a flaky downstream service (the Gemini parser)."""
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+GEMINI_BREAKER_WINDOW_SECONDS = float(os.getenv("GEMINI_BREAKER_WINDOW_SECONDS", "60"))
+# Too few calls in the window says nothing about the service's health
+GEMINI_BREAKER_MIN_CALLS = int(os.getenv("GEMINI_BREAKER_MIN_CALLS", "5"))
+GEMINI_BREAKER_ERROR_RATE = float(os.getenv("GEMINI_BREAKER_ERROR_RATE", "0.5"))
+GEMINI_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("GEMINI_BREAKER_SLOW_CALL_SECONDS", "4"))
+GEMINI_BREAKER_SLOW_RATE = float(os.getenv("GEMINI_BREAKER_SLOW_RATE", "0.5"))
+GEMINI_BREAKER_OPEN_SECONDS = float(os.getenv("GEMINI_BREAKER_OPEN_SECONDS", "30"))
+GEMINI_BREAKER_HALF_OPEN_PROBES = int(os.getenv("GEMINI_BREAKER_HALF_OPEN_PROBES", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a rolling time window.
+
+    Every call's outcome and latency is kept for ``window_seconds``.  Once
+    the window holds at least ``min_calls`` calls, the breaker opens if the
+    share of failures or of calls slower than ``slow_call_seconds`` reaches
+    its threshold.  While open, ``allow`` returns False without touching
+    the network.  After ``open_seconds`` the breaker goes half-open and
+    lets up to ``half_open_probes`` calls through: a successful, fast
+    probe closes it, anything else reopens it for another period.
+
+    Callers pair every allowed call with exactly one ``record``; passing
+    ``success=None`` (e.g. the caller was cancelled) frees a probe slot
+    without counting for or against the service.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = GEMINI_BREAKER_WINDOW_SECONDS,
+        min_calls: int = GEMINI_BREAKER_MIN_CALLS,
+        error_rate: float = GEMINI_BREAKER_ERROR_RATE,
+        slow_call_seconds: float = GEMINI_BREAKER_SLOW_CALL_SECONDS,
+        slow_rate: float = GEMINI_BREAKER_SLOW_RATE,
+        open_seconds: float = GEMINI_BREAKER_OPEN_SECONDS,
+        half_open_probes: int = GEMINI_BREAKER_HALF_OPEN_PROBES,
+    ) -> None:
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self.state = CLOSED
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()  # (finished_at, failed, slow)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.opens = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; False means fail fast."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+            print(f"[WARNING] {self.name} circuit half-open, probing")
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def is_open(self) -> bool:
+        """
+        Whether calls are being rejected right now, without taking a
+        half-open probe slot; lets callers fail fast before queueing.
+        """
+        if self.state == OPEN and time.monotonic() - self._opened_at < self.open_seconds:
+            self.rejected += 1
+            return True
+        return False
+
+    def record(self, success: Optional[bool], latency: float) -> None:
+        """Outcome of a call that ``allow`` let through."""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if success is None:
+                return
+            if success and latency < self.slow_call_seconds:
+                self.state = CLOSED
+                self._calls.clear()
+                print(f"[OK] {self.name} circuit closed")
+            else:
+                self._open()
+            return
+        if success is None or self.state == OPEN:
+            return
+
+        now = time.monotonic()
+        self._calls.append((now, not success, latency >= self.slow_call_seconds))
+        self._trim(now)
+        if len(self._calls) < self.min_calls:
+            return
+        failed, slow = self._rates()
+        if failed >= self.error_rate or slow >= self.slow_rate:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self._calls.clear()
+        self.opens += 1
+        print(f"[WARNING] {self.name} circuit open for {self.open_seconds:g}s")
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _rates(self) -> Tuple[float, float]:
+        if not self._calls:
+            return 0.0, 0.0
+        total = len(self._calls)
+        return (
+            sum(1 for _, failed, _ in self._calls if failed) / total,
+            sum(1 for _, _, slow in self._calls if slow) / total,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        self._trim(time.monotonic())
+        failed, slow = self._rates()
+        stats: Dict[str, Any] = {
+            "state": self.state,
+            "windowCalls": len(self._calls),
+            "errorRate": round(failed, 3),
+            "slowRate": round(slow, 3),
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+        if self.state == OPEN:
+            remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+            stats["retryInSeconds"] = round(max(0.0, remaining), 1)
+        return stats
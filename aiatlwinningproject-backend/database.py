@@ -1,6 +1,8 @@
 """MongoDB database connection and configuration."""
 import os
+from typing import Dict, List
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, WriteConcern
 from pymongo.errors import ConnectionFailure
 
 MONGODB_URI = os.getenv(
@@ -13,6 +15,33 @@ DB_NAME = os.getenv("DB_NAME", "flashrequest")
 client: AsyncIOMotorClient = None
 db = None
 
+# Indexes backing every hot query, created idempotently on startup.
+# Changing an existing index's options requires dropping it by name first.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "messages": [
+        # Thread history pages: thread_id equality, then (timestamp, _id) keyset range/sort
+        IndexModel([("thread_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+                   name="thread_timestamp"),
+    ],
+    "message_threads": [
+        IndexModel([("thread_id", ASCENDING)], name="thread_id"),
+        # One thread per pair of users; threads not yet backfilled have no pair_key
+        IndexModel([("pair_key", ASCENDING)], name="pair_key_unique", unique=True,
+                   partialFilterExpression={"pair_key": {"$exists": True}}),
+        # Inbox: $or over both participant fields, newest first
+        IndexModel([("participant1_id", ASCENDING), ("updated_at", DESCENDING)],
+                   name="participant1_updated"),
+        IndexModel([("participant2_id", ASCENDING), ("updated_at", DESCENDING)],
+                   name="participant2_updated"),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "seller_profiles": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+}
+
 
 async def connect_db():
     """Connect to MongoDB database."""
@@ -31,6 +60,38 @@ async def connect_db():
         return None
 
 
+def write_concern_from_env(name: str) -> WriteConcern:
+    """WriteConcern from an env var holding a ``w`` value: a number or a tag such as "majority"."""
+    value = os.getenv(name, "").strip()
+    if not value:
+        return WriteConcern()
+    return WriteConcern(w=int(value) if value.isdigit() else value)
+
+
+async def ensure_indexes() -> Dict[str, List[str]]:
+    """Create every index in INDEXES; existing identical indexes are a no-op."""
+    created: Dict[str, List[str]] = {}
+    if db is None:
+        return created
+    for collection, indexes in INDEXES.items():
+        # One at a time, so one failing index does not hold back its siblings
+        for index in indexes:
+            name = index.document.get("name")
+            try:
+                names = await db[collection].create_indexes([index])
+            except ConnectionFailure as e:
+                # Every remaining index would wait out the same server selection timeout
+                print(f'[WARNING] MongoDB unreachable, skipping index creation: {e}')
+                return created
+            except Exception as e:
+                # e.g. duplicate emails blocking the unique index; keep serving without it
+                print(f'[WARNING] Could not create index {name} on {collection}: {e}')
+                continue
+            if names:
+                created.setdefault(collection, []).extend(names)
+    return created
+
+
 async def close_db():
     """Close MongoDB connection."""
     global client
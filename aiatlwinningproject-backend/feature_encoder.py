@@ -6,6 +6,8 @@ import numpy as np
 
 
 Number = Optional[float]
+# Seller-side part of a feature row: the vector and its activated features
+SellerBlock = Tuple[np.ndarray, List[Tuple[str, float]]]
 
 
 class FeatureEncoder:
@@ -32,6 +34,7 @@ class FeatureEncoder:
         request: Dict[str, Any],
         seller_profile: Dict[str, Any],
         representative_item: Optional[Dict[str, Any]] = None,
+        seller_block: Optional[SellerBlock] = None,
     ) -> Tuple[np.ndarray, List[Tuple[str, float]]]:
         """
         Build a feature vector for a (request, seller_profile, item) triple.
@@ -40,70 +43,14 @@ class FeatureEncoder:
         (feature_name, value) pairs that were activated.  The second return
         value is purely for debugging and observability and is capped to
         avoid flooding the API response.
+
+        The seller and item features do not depend on the request, so a
+        block from ``encode_seller_block`` can be passed in and reused
+        across every request scored against that seller.
         """
         vector = np.zeros(len(self.feature_names), dtype=np.float32)
         activated: List[Tuple[str, float]] = []
-
-        def prefix_exists(prefix: str) -> bool:
-            if prefix not in self._prefix_cache:
-                target = f"{prefix}_"
-                self._prefix_cache[prefix] = any(
-                    name.startswith(target) for name in self.feature_names
-                )
-            return self._prefix_cache[prefix]
-
-        def set_numeric(feature_name: str, value: Number) -> None:
-            if value is None:
-                return
-            idx = self.index_by_name.get(feature_name)
-            if idx is None:
-                return
-            try:
-                numeric_value = float(value)
-            except (TypeError, ValueError):
-                return
-            vector[idx] = numeric_value
-            activated.append((feature_name, float(numeric_value)))
-
-        def set_categorical(prefix: str, value: Optional[str]) -> None:
-            if not prefix_exists(prefix):
-                return
-            cleaned = (value or "").strip()
-            if not cleaned:
-                nan_feature = f"{prefix}_nan"
-                idx = self.index_by_name.get(nan_feature)
-                if idx is not None:
-                    vector[idx] = 1.0
-                    activated.append((nan_feature, 1.0))
-                return
-
-            feature_name = f"{prefix}_{cleaned}"
-            idx = self.index_by_name.get(feature_name)
-            if idx is not None:
-                vector[idx] = 1.0
-                activated.append((feature_name, 1.0))
-                return
-
-            # Fallback to the explicit nan bucket if the feature was unseen
-            nan_feature = f"{prefix}_nan"
-            idx = self.index_by_name.get(nan_feature)
-            if idx is not None:
-                vector[idx] = 1.0
-                activated.append((nan_feature, 1.0))
-
-        def set_multi(prefix: str, values: Optional[Iterable[str]]) -> None:
-            if not prefix_exists(prefix):
-                return
-            items = [item for item in (values or []) if isinstance(item, str) and item.strip()]
-            if not items:
-                nan_feature = f"{prefix}_nan"
-                idx = self.index_by_name.get(nan_feature)
-                if idx is not None:
-                    vector[idx] = 1.0
-                    activated.append((nan_feature, 1.0))
-                return
-            for item in items:
-                set_categorical(prefix, item)
+        set_numeric, set_categorical, set_multi = self._setters(vector, activated)
 
         # --- Flash Request features ---
         request_item_meta = request.get("item_meta", {}) or {}
@@ -130,6 +77,34 @@ class FeatureEncoder:
         set_numeric("req_location_device_gps_lat", req_gps.get("lat"))
         set_numeric("req_location_device_gps_lng", req_gps.get("lng"))
 
+        # Request and seller features occupy disjoint columns (req_* vs sp_*/item_*)
+        if seller_block is None:
+            seller_block = self.encode_seller_block(seller_profile, representative_item)
+        block_vector, block_activated = seller_block
+        vector += block_vector
+        activated.extend(block_activated)
+
+        # Deduplicate activated features while preserving the original order.
+        seen: set[str] = set()
+        unique_activated: List[Tuple[str, float]] = []
+        for name, value in activated:
+            if name in seen:
+                continue
+            seen.add(name)
+            unique_activated.append((name, value))
+
+        return vector, unique_activated
+
+    def encode_seller_block(
+        self,
+        seller_profile: Dict[str, Any],
+        representative_item: Optional[Dict[str, Any]] = None,
+    ) -> SellerBlock:
+        """Seller-profile and representative-item features, independent of any request."""
+        vector = np.zeros(len(self.feature_names), dtype=np.float32)
+        activated: List[Tuple[str, float]] = []
+        set_numeric, set_categorical, set_multi = self._setters(vector, activated)
+
         # --- Seller Profile features ---
         seller_context = seller_profile.get("context", {}) or {}
 
@@ -169,16 +144,70 @@ class FeatureEncoder:
         set_numeric("item_location_device_gps_lng", item_gps.get("lng"))
         set_categorical("item_location_text_input", item_location.get("text_input"))
 
-        # Deduplicate activated features while preserving the original order.
-        seen: set[str] = set()
-        unique_activated: List[Tuple[str, float]] = []
-        for name, value in activated:
-            if name in seen:
-                continue
-            seen.add(name)
-            unique_activated.append((name, value))
+        return vector, activated
 
-        return vector, unique_activated
+    def _setters(self, vector: np.ndarray, activated: List[Tuple[str, float]]):
+        """Feature writers bound to ``vector``, recording into ``activated``."""
+
+        def prefix_exists(prefix: str) -> bool:
+            if prefix not in self._prefix_cache:
+                target = f"{prefix}_"
+                self._prefix_cache[prefix] = any(
+                    name.startswith(target) for name in self.feature_names
+                )
+            return self._prefix_cache[prefix]
+
+        def set_numeric(feature_name: str, value: Number) -> None:
+            if value is None:
+                return
+            idx = self.index_by_name.get(feature_name)
+            if idx is None:
+                return
+            try:
+                numeric_value = float(value)
+            except (TypeError, ValueError):
+                return
+            vector[idx] = numeric_value
+            activated.append((feature_name, float(numeric_value)))
+
+        def set_categorical(prefix: str, value: Optional[str]) -> None:
+            if not prefix_exists(prefix):
+                return
+            cleaned = (value or "").strip()
+            if not cleaned:
+                nan_feature = f"{prefix}_nan"
+                idx = self.index_by_name.get(nan_feature)
+                if idx is not None:
+                    vector[idx] = 1.0
+                    activated.append((nan_feature, 1.0))
+                return
 
+            feature_name = f"{prefix}_{cleaned}"
+            idx = self.index_by_name.get(feature_name)
+            if idx is not None:
+                vector[idx] = 1.0
+                activated.append((feature_name, 1.0))
+                return
 
+            # Fallback to the explicit nan bucket if the feature was unseen
+            nan_feature = f"{prefix}_nan"
+            idx = self.index_by_name.get(nan_feature)
+            if idx is not None:
+                vector[idx] = 1.0
+                activated.append((nan_feature, 1.0))
+
+        def set_multi(prefix: str, values: Optional[Iterable[str]]) -> None:
+            if not prefix_exists(prefix):
+                return
+            items = [item for item in (values or []) if isinstance(item, str) and item.strip()]
+            if not items:
+                nan_feature = f"{prefix}_nan"
+                idx = self.index_by_name.get(nan_feature)
+                if idx is not None:
+                    vector[idx] = 1.0
+                    activated.append((nan_feature, 1.0))
+                return
+            for item in items:
+                set_categorical(prefix, item)
 
+        return set_numeric, set_categorical, set_multi
@@ -0,0 +1,148 @@
+"""Shared, pooled HTTP client for calls to the Gemini parsing service."""
+from __future__ import annotations
+
+import importlib.util
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "10"))
+GEMINI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("GEMINI_CONNECT_TIMEOUT_SECONDS", "5"))
+# Longest a request may wait for a free pooled connection
+GEMINI_POOL_TIMEOUT_SECONDS = float(os.getenv("GEMINI_POOL_TIMEOUT_SECONDS", "5"))
+GEMINI_MAX_CONNECTIONS = int(os.getenv("GEMINI_MAX_CONNECTIONS", "20"))
+# Below GEMINI_MAX_CONNECTIONS, sustained load closes and reopens connections on every call
+GEMINI_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("GEMINI_MAX_KEEPALIVE_CONNECTIONS", str(GEMINI_MAX_CONNECTIONS))
+)
+GEMINI_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("GEMINI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+GEMINI_HTTP2 = os.getenv("GEMINI_HTTP2", "").lower() in ("1", "true", "yes")
+
+TIMING_SAMPLES = 512
+
+
+def _percentile(samples: Deque[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 2)
+
+
+class GeminiHTTPClient:
+    """
+    One long-lived ``httpx.AsyncClient`` for the Gemini service.
+
+    Connections are kept alive and reused across parses instead of paying
+    a TCP connect and TLS handshake per call.  Every request carries an
+    httpcore trace hook that records how long it queued for a pooled
+    connection and, when a new connection had to be opened, how long the
+    connect and TLS handshake took.
+    """
+
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+        self.http2 = False
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+        self.queue_times: Deque[float] = deque(maxlen=TIMING_SAMPLES)
+        self.connect_times: Deque[float] = deque(maxlen=TIMING_SAMPLES)
+        self.tls_times: Deque[float] = deque(maxlen=TIMING_SAMPLES)
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        self.http2 = GEMINI_HTTP2
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            print("[WARNING] GEMINI_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+            self.http2 = False
+        self._client = httpx.AsyncClient(
+            timeout=self._timeout(GEMINI_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=GEMINI_MAX_CONNECTIONS,
+                max_keepalive_connections=GEMINI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=GEMINI_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            http2=self.http2,
+        )
+
+    @staticmethod
+    def _timeout(seconds: float) -> httpx.Timeout:
+        return httpx.Timeout(seconds, connect=GEMINI_CONNECT_TIMEOUT_SECONDS, pool=GEMINI_POOL_TIMEOUT_SECONDS)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def post_json(
+        self, url: str, payload: Dict[str, Any], timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """
+        POST ``payload`` as JSON; raises httpx errors like ``AsyncClient.post``.
+
+        ``timeout`` overrides the read/write timeout for calls known to take
+        longer than one parse, such as batches.
+        """
+        if self._client is None:
+            # Scripts and tests may call in without the app's startup hook
+            await self.start()
+
+        started = time.perf_counter()
+        marks: Dict[str, float] = {}
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            now = time.perf_counter()
+            if event_name.endswith("send_request_headers.started") and "sent" not in marks:
+                marks["sent"] = now
+                self.queue_times.append(now - started - marks.get("handshake", 0.0))
+            elif event_name == "connection.connect_tcp.started":
+                marks["connect"] = now
+            elif event_name == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+                self.connect_times.append(now - marks.get("connect", now))
+                marks["handshake"] = now - marks.get("connect", now)
+            elif event_name == "connection.start_tls.started":
+                marks["tls"] = now
+            elif event_name == "connection.start_tls.complete":
+                self.tls_times.append(now - marks.get("tls", now))
+                marks["handshake"] = marks.get("handshake", 0.0) + now - marks.get("tls", now)
+
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await self._client.post(
+                url,
+                json=payload,
+                timeout=self._timeout(timeout) if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                extensions={"trace": trace},
+            )
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "maxConnections": GEMINI_MAX_CONNECTIONS,
+            "inFlight": self.in_flight,
+            "peakInFlight": self.peak_in_flight,
+            "poolUtilization": round(self.in_flight / GEMINI_MAX_CONNECTIONS, 3) if GEMINI_MAX_CONNECTIONS else None,
+            "requests": self.requests,
+            "errors": self.errors,
+            "connectionsOpened": self.connections_opened,
+            "queueMsP50": _percentile(self.queue_times, 0.5),
+            "queueMsP95": _percentile(self.queue_times, 0.95),
+            "connectMsP50": _percentile(self.connect_times, 0.5),
+            "connectMsP95": _percentile(self.connect_times, 0.95),
+            "tlsMsP50": _percentile(self.tls_times, 0.5),
+            "tlsMsP95": _percentile(self.tls_times, 0.95),
+        }
@@ -0,0 +1,98 @@
+"""Per-user cache of the /api/messages inbox, invalidated through the realtime broker."""
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from realtime import InProcessBroker
+
+INBOX_CACHE_TTL_SECONDS = float(os.getenv("INBOX_CACHE_TTL_SECONDS", "30"))
+INBOX_CACHE_MAX_USERS = int(os.getenv("INBOX_CACHE_MAX_USERS", "10000"))
+
+INVALIDATE_TOPIC = "inbox:invalidate"
+
+
+class InboxCache:
+    """
+    LRU + TTL cache of each user's thread list.
+
+    Entries are dropped whenever something that shows up in an inbox
+    changes (a send, a new thread, mark-as-read).  Invalidations are
+    published on the broker rather than applied directly, so every worker
+    subscribed to a shared broker drops its copy too; the TTL bounds
+    staleness for anything not covered by an event (e.g. a renamed user).
+
+    A rebuild that started before an invalidation must not store its
+    result afterwards, so callers take a ticket with ``begin`` before
+    querying and ``set`` only stores if no invalidation arrived since.
+    """
+
+    def __init__(
+        self,
+        broker: Optional[InProcessBroker] = None,
+        ttl_seconds: float = INBOX_CACHE_TTL_SECONDS,
+        max_users: int = INBOX_CACHE_MAX_USERS,
+    ) -> None:
+        self.broker = broker or InProcessBroker()
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._pending: Dict[str, object] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.broker.subscribe(self._on_event)
+
+    def get(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def begin(self, user_id: str) -> object:
+        """Ticket for a rebuild of ``user_id``'s inbox that is about to start."""
+        ticket = object()
+        self._pending[user_id] = ticket
+        return ticket
+
+    def set(self, user_id: str, threads: List[Dict[str, Any]], ticket: object) -> None:
+        if self._pending.get(user_id) is not ticket:
+            return  # invalidated (or superseded) while the rebuild ran
+        del self._pending[user_id]
+        if self.ttl_seconds <= 0 or self.max_users <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, threads)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, *user_ids: str) -> None:
+        """Drop the given users' inboxes on every worker sharing the broker."""
+        user_ids = [user_id for user_id in user_ids if user_id]
+        if user_ids:
+            await self.broker.publish(INVALIDATE_TOPIC, {"userIds": user_ids})
+
+    async def _on_event(self, topic: str, event: Dict[str, Any]) -> None:
+        if topic != INVALIDATE_TOPIC:
+            return
+        for user_id in event.get("userIds", []):
+            self._entries.pop(user_id, None)
+            self._pending.pop(user_id, None)
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "users": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,310 @@
+"""Columnar in-memory index over the campus seller listings."""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_category(category: str) -> str:
+    """Normalize backend category to frontend category."""
+    if not category:
+        return "Other"
+    category_lower = category.lower().replace("_", " ")
+    if "textbook" in category_lower:
+        return "Textbooks"
+    elif "electronic" in category_lower:
+        return "Electronics"
+    elif "cloth" in category_lower:
+        return "Clothing"
+    elif "food" in category_lower or "snack" in category_lower:
+        return "Food"
+    elif "furniture" in category_lower or "furnish" in category_lower:
+        return "Furniture"
+    else:
+        return "Other"
+
+
+def get_category_emoji(category: str) -> str:
+    """Get emoji based on category."""
+    category_lower = category.lower()
+    if "textbook" in category_lower:
+        return "📚"
+    elif "electronic" in category_lower:
+        return "💻"
+    elif "cloth" in category_lower:
+        return "👕"
+    elif "food" in category_lower:
+        return "🍕"
+    elif "furniture" in category_lower:
+        return "🪑"
+    else:
+        return "📦"
+
+
+def calculate_seller_badges(seller: Dict[str, Any]) -> List[str]:
+    """Calculate badges for a seller based on their stats."""
+    badges = []
+
+    # Verified Student - if seller has a rating, consider them verified
+    if seller.get("seller_rating_avg", 0) > 0:
+        badges.append("Verified Student")
+
+    # Top Seller - if total items sold > 20
+    total_items_sold = sum(
+        s.get("total_items_sold", 0)
+        for s in seller.get("sales_history_summary", [])
+    )
+    if total_items_sold > 20:
+        badges.append("Top Seller")
+
+    # Campus Leader - if trust score > 90
+    # Calculate trust score: base 70 + up to 25 based on rating + items sold
+    rating = seller.get("seller_rating_avg", 0)
+    trust_score = min(95, 70 + min(15, (rating - 3) * 5) + min(10, total_items_sold // 5))
+    if trust_score > 90:
+        badges.append("Campus Leader")
+
+    return badges
+
+
+def calculate_trust_score(seller: Dict[str, Any]) -> int:
+    """Calculate trust score for a seller."""
+    rating = seller.get("seller_rating_avg", 0)
+    total_items_sold = sum(
+        s.get("total_items_sold", 0)
+        for s in seller.get("sales_history_summary", [])
+    )
+    # Base score 70, add up to 15 for rating, up to 10 for volume
+    return min(95, 70 + min(15, int((rating - 3) * 5)) + min(10, total_items_sold // 5))
+
+
+# Right-open price buckets for the listings histogram; the last one is open-ended.
+PRICE_BUCKET_EDGES = np.array([0, 10, 25, 50, 100, 250, np.inf], dtype=np.float64)
+
+
+def date_ordinal(value: Optional[str]) -> int:
+    """Convert an ISO ``date_posted`` string to a sortable ordinal (0 if unknown)."""
+    if not value:
+        return 0
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return 0
+
+
+class ListingIndex:
+    """
+    Column-oriented snapshot of every listing in ``campus_sellers.json``.
+
+    Each listing is one row.  Numeric attributes (price, category code,
+    verified flag, posting date, owning seller) live in parallel numpy
+    arrays so filter combinations evaluate as a single boolean mask.
+    Strings are stored once: categories in ``category_names`` addressed
+    by code, and seller-level fields in ``seller_owners`` addressed by
+    seller index.  Response dicts are only materialised for the rows
+    that survive filtering.
+    """
+
+    def __init__(self, sellers: Sequence[Dict[str, Any]]) -> None:
+        self.category_names: List[str] = []
+        self.seller_owners: List[Dict[str, Any]] = []
+        self.seller_names: List[str] = []
+        self.seller_sales: List[int] = []
+
+        category_codes: Dict[str, int] = {}
+        prices: List[float] = []
+        codes: List[int] = []
+        dates: List[int] = []
+        seller_rows: List[int] = []
+        verified_by_seller: List[bool] = []
+
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.descriptions: List[str] = []
+        self.conditions: List[str] = []
+        self.locations: List[str] = []
+        self.photos: List[str] = []
+        self.dates_posted: List[str] = []
+
+        for seller in sellers:
+            seller_listings = seller.get("current_item_listings", [])
+            if not seller_listings:
+                continue
+
+            # Calculate seller stats once; every listing of the seller shares them
+            total_items_sold = sum(
+                s.get("total_items_sold", 0)
+                for s in seller.get("sales_history_summary", [])
+            )
+            seller_rating = seller.get("seller_rating_avg", 0)
+            verified = seller_rating > 0
+            location_keywords = seller.get("inferred_location_keywords", [])
+            seller_location = location_keywords[0] if location_keywords else "Campus"
+
+            seller_idx = len(self.seller_owners)
+            self.seller_owners.append({
+                "id": seller.get("user_id", ""),
+                "name": seller.get("full_name", "Unknown Seller"),
+                "major": seller.get("inferred_major", "Undeclared"),
+                "dorm": seller_location,
+                "rating": round(seller_rating, 2) if seller_rating else 0.0,
+                "verified": verified,
+                "trustScore": calculate_trust_score(seller),
+                "pastTrades": total_items_sold,
+                "badges": calculate_seller_badges(seller),
+            })
+            self.seller_names.append(seller.get("full_name", "Unknown Seller"))
+            self.seller_sales.append(total_items_sold)
+            verified_by_seller.append(verified)
+
+            for listing_index, listing in enumerate(seller_listings):
+                raw_category = listing.get("category", "Other")
+                normalized = normalize_category(raw_category)
+                code = category_codes.get(normalized)
+                if code is None:
+                    code = category_codes[normalized] = len(self.category_names)
+                    self.category_names.append(normalized)
+
+                price = listing.get("price", 0)
+                date_posted = listing.get("date_posted", "")
+
+                self.ids.append(
+                    f"{seller.get('user_id', 'unknown')}-{listing.get('parsed_item', 'item')}-{listing_index}-{date_posted}"
+                )
+                self.titles.append(listing.get("parsed_item", "Item"))
+                self.descriptions.append(listing.get("description", ""))
+                self.conditions.append(listing.get("condition", ""))
+                self.locations.append(listing.get("location", "") or seller_location)
+                self.photos.append(get_category_emoji(raw_category))
+                self.dates_posted.append(date_posted)
+
+                # Prices are displayed (and therefore filtered) as whole dollars
+                prices.append(float(int(price)) if price else 0.0)
+                codes.append(code)
+                dates.append(date_ordinal(date_posted))
+                seller_rows.append(seller_idx)
+
+        self.price = np.asarray(prices, dtype=np.float64)
+        self.category_code = np.asarray(codes, dtype=np.int32)
+        self.date_ordinal = np.asarray(dates, dtype=np.int32)
+        self.seller_index = np.asarray(seller_rows, dtype=np.int32)
+        self.verified = np.asarray(verified_by_seller, dtype=bool)[self.seller_index] \
+            if seller_rows else np.zeros(0, dtype=bool)
+        self.category_by_name: Dict[str, int] = category_codes
+
+        # Lower-cased haystack for the substring search filter
+        self.search_text = np.asarray(
+            [
+                f"{title}\n{description}\n{condition}".lower()
+                for title, description, condition in zip(self.titles, self.descriptions, self.conditions)
+            ],
+            dtype=np.str_,
+        )
+
+        # Newest first; ties keep file order
+        self.order = np.lexsort((np.arange(len(self.ids)), -self.date_ordinal.astype(np.int64)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def filter_masks(
+        self,
+        search: Optional[str] = None,
+        category: Optional[str] = None,
+        price_max: Optional[float] = None,
+        verified_only: Optional[bool] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Evaluate each active filter as its own boolean mask over all rows."""
+        masks: Dict[str, np.ndarray] = {}
+        if search:
+            masks["search"] = np.char.find(self.search_text, search.lower()) >= 0
+        if category and category != "All":
+            code = self.category_by_name.get(category)
+            if code is None:
+                masks["category"] = np.zeros(len(self.ids), dtype=bool)
+            else:
+                masks["category"] = self.category_code == code
+        if price_max is not None:
+            masks["price"] = self.price <= price_max
+        if verified_only:
+            masks["verified"] = self.verified
+        return masks
+
+    def combine(self, masks: Dict[str, np.ndarray], exclude: Optional[str] = None) -> np.ndarray:
+        """AND together filter masks, optionally leaving one filter out."""
+        combined = np.ones(len(self.ids), dtype=bool)
+        for name, mask in masks.items():
+            if name != exclude:
+                combined &= mask
+        return combined
+
+    def mask(
+        self,
+        search: Optional[str] = None,
+        category: Optional[str] = None,
+        price_max: Optional[float] = None,
+        verified_only: Optional[bool] = None,
+    ) -> np.ndarray:
+        """Evaluate a filter combination as one boolean mask over all rows."""
+        return self.combine(self.filter_masks(search, category, price_max, verified_only))
+
+    def facets(self, masks: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """
+        Compute facet counts from already-evaluated filter masks.
+
+        Each facet ignores its own filter so the UI can show how many
+        results picking a different value would give (e.g. the count for
+        every category while one category is selected).  Counts come from
+        ``bincount``/``histogram`` over the shared masks; no filter is
+        re-run per facet.
+        """
+        category_rows = self.combine(masks, exclude="category")
+        category_counts = np.bincount(
+            self.category_code[category_rows], minlength=len(self.category_names)
+        )
+
+        verified_rows = self.combine(masks, exclude="verified")
+        verified_count = int(np.count_nonzero(self.verified & verified_rows))
+
+        price_rows = self.combine(masks, exclude="price")
+        bucket_counts, _ = np.histogram(self.price[price_rows], bins=PRICE_BUCKET_EDGES)
+
+        buckets = []
+        for idx, count in enumerate(bucket_counts):
+            upper = PRICE_BUCKET_EDGES[idx + 1]
+            buckets.append({
+                "min": int(PRICE_BUCKET_EDGES[idx]),
+                "max": None if np.isinf(upper) else int(upper),
+                "count": int(count),
+            })
+
+        return {
+            "categories": {
+                name: int(category_counts[code])
+                for code, name in enumerate(self.category_names)
+            },
+            "verified": verified_count,
+            "priceBuckets": buckets,
+        }
+
+    def rows(self, mask: np.ndarray) -> np.ndarray:
+        """Row indices selected by ``mask`` in newest-first order."""
+        return self.order[mask[self.order]]
+
+    def to_dict(self, row: int) -> Dict[str, Any]:
+        """Materialise a single listing row in the API response shape."""
+        price = self.price[row]
+        return {
+            "id": self.ids[row],
+            "title": self.titles[row],
+            "category": self.category_names[self.category_code[row]],
+            "price": f"${int(price)}" if price else "$0",
+            "photo": self.photos[row],
+            "condition": self.conditions[row],
+            "description": self.descriptions[row],
+            "location": self.locations[row],
+            "lastActive": self.dates_posted[row],
+            "owner": dict(self.seller_owners[self.seller_index[row]]),
+        }
@@ -0,0 +1,304 @@
+"""
+Local rule-based FLASH_REQUEST parser.
+
+Deterministic, sub-millisecond stand-in for the Gemini parser: used when
+Gemini is unavailable so matching still sees an item, price, urgency and
+place instead of only a category.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+WORD_RE = re.compile(r"[A-Za-z0-9']+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [token.lower() for token in WORD_RE.findall(str(text)) if len(token) > 2]
+
+
+# Campus marketplace categories (the taxonomy Gemini uses for requests),
+# checked in order so the more specific categories win ties
+LOCAL_CATEGORY_KEYWORDS: List[Tuple[str, Set[str]]] = [
+    ("gaming", {
+        "gaming", "gamer", "console", "ps4", "ps5", "playstation", "xbox", "nintendo", "switch",
+        "controller", "joycon", "joycons", "dualsense", "game", "games", "esports", "hyperx",
+    }),
+    ("textbooks", {
+        "textbook", "textbooks", "book", "books", "edition", "novel", "calculus", "chemistry",
+        "biology", "psychology", "psych", "history", "economics", "physics", "algorithms",
+        "statistics", "reader", "anthology", "paperback", "hardcover",
+    }),
+    ("art_supplies", {
+        "paint", "paints", "painting", "watercolor", "watercolors", "acrylic", "acrylics", "canvas",
+        "easel", "sketchbook", "sketch", "brushes", "brush", "charcoal", "pastels", "copic",
+        "prismacolor", "markers", "art",
+    }),
+    ("electronics", {
+        "charger", "charging", "cable", "usb", "laptop", "macbook", "phone", "iphone", "android",
+        "headphones", "earbuds", "airpods", "speaker", "adapter", "hdmi", "monitor", "tablet",
+        "ipad", "calculator", "power", "bank", "battery", "keyboard", "mouse", "webcam", "hub",
+        "bluetooth", "camera", "wacom", "headset", "electronics",
+    }),
+    ("dorm_essentials", {
+        "lamp", "fridge", "refrigerator", "mini", "microwave", "fan", "pillow", "blanket", "sheets",
+        "comforter", "mattress", "topper", "hamper", "kettle", "coffee", "blender", "storage",
+        "bin", "mirror", "rug", "towel", "towels", "bottle", "dorm", "yoga",
+    }),
+    ("school_supplies", {
+        "notebook", "notebooks", "pen", "pens", "pencil", "pencils", "highlighter", "highlighters",
+        "stapler", "binder", "folder", "backpack", "planner", "scantron", "bluebook", "ruler",
+        "index", "cards", "supplies",
+    }),
+    ("apparel", {
+        "shirt", "tshirt", "hoodie", "sweater", "jacket", "coat", "blazer", "suit", "tie", "dress",
+        "skirt", "pants", "jeans", "shorts", "shoes", "sneakers", "boots", "hat", "scarf", "gloves",
+        "sweatshirt", "jersey", "clothes", "clothing",
+    }),
+    ("furniture", {"desk", "chair", "table", "shelf", "bookshelf", "dresser", "couch", "futon", "ottoman"}),
+    ("sporting_goods", {
+        "bike", "bicycle", "helmet", "ball", "racket", "racquet", "skateboard", "weights",
+        "dumbbells", "cleats", "glove",
+    }),
+]
+LOCAL_CATEGORY_STRONG_TOKENS = {"gaming", "textbook", "textbooks", "charger", "lamp", "fridge", "shirt", "hoodie"}
+
+LOCAL_COLORS = [
+    "black", "white", "gray", "grey", "silver", "red", "blue", "navy", "green", "yellow",
+    "orange", "purple", "pink", "brown", "beige", "tan", "gold",
+]
+LOCAL_MATERIALS = ["leather", "cotton", "wool", "denim", "wood", "wooden", "metal", "plastic", "polyester", "fleece", "canvas"]
+LOCAL_BRANDS: Dict[str, str] = {
+    "apple": "Apple", "anker": "Anker", "logitech": "Logitech", "hyperx": "HyperX", "razer": "Razer",
+    "corsair": "Corsair", "steelseries": "SteelSeries", "wacom": "Wacom", "samsung": "Samsung",
+    "sony": "Sony", "bose": "Bose", "jbl": "JBL", "beats": "Beats", "dell": "Dell", "lenovo": "Lenovo",
+    "nintendo": "Nintendo", "microsoft": "Microsoft", "texas instruments": "Texas Instruments",
+    "casio": "Casio", "canon": "Canon", "nike": "Nike", "adidas": "Adidas", "levi's": "Levi's",
+    "north face": "The North Face", "patagonia": "Patagonia", "ikea": "IKEA", "copic": "Copic",
+    "prismacolor": "Prismacolor", "winsor": "Winsor & Newton", "sakura": "Sakura", "moleskine": "Moleskine",
+    "adobe": "Adobe", "nvidia": "NVIDIA", "hp": "HP", "asus": "ASUS",
+    "acer": "Acer", "google": "Google", "fitbit": "Fitbit",
+}
+# Products that imply their maker; only used when no brand is named outright
+LOCAL_PRODUCT_BRANDS: Dict[str, str] = {
+    "ti-84": "Texas Instruments", "ti-83": "Texas Instruments", "ti-89": "Texas Instruments",
+    "iphone": "Apple", "ipad": "Apple", "macbook": "Apple", "airpods": "Apple",
+    "xbox": "Microsoft", "playstation": "Sony", "ps4": "Sony", "ps5": "Sony", "dualsense": "Sony",
+}
+LOCAL_BRAND_RE = re.compile(r"\b(" + "|".join(re.escape(key) for key in LOCAL_BRANDS) + r")\b", re.IGNORECASE)
+LOCAL_PRODUCT_BRAND_RE = re.compile(
+    r"\b(" + "|".join(re.escape(key) for key in LOCAL_PRODUCT_BRANDS) + r")\b", re.IGNORECASE
+)
+# Longer phrases first so "like new" is not also read as "new"
+LOCAL_CONDITION_RE = re.compile(
+    r"\b(brand new|like[- ]new|excellent|very good|good|gently used|fair|new|used|working)\b", re.IGNORECASE
+)
+LOCAL_COLOR_RE = re.compile(r"\b(" + "|".join(LOCAL_COLORS) + r")\b", re.IGNORECASE)
+LOCAL_MATERIAL_RE = re.compile(r"\b(" + "|".join(LOCAL_MATERIALS) + r")\b", re.IGNORECASE)
+
+# Campus places, longest first so "campus library" wins over "library"
+LOCAL_LOCATION_PLACES = [
+    "student center", "student union", "dining hall", "art studio", "art building", "arts building",
+    "engineering building", "engineering hall", "science building", "esports lounge", "rec center",
+    "bookstore", "library", "quad", "dorms", "dorm", "gym", "stadium", "union", "commons",
+]
+LOCAL_LOCATION_RE = re.compile(
+    r"\b((?:(?:my|the|main|north|south|east|west|central|campus|on-campus|university)\s+){0,2}(?:"
+    + "|".join(re.escape(place) for place in LOCAL_LOCATION_PLACES)
+    + r"))\b",
+    re.IGNORECASE,
+)
+ON_CAMPUS_RE = re.compile(r"\bon[- ]campus\b", re.IGNORECASE)
+
+PRICE_PATTERNS = [
+    # A range ("$20-30", "50 to 70 bucks") caps at its upper bound
+    re.compile(r"\$\s?\d+(?:\.\d{1,2})?\s*(?:-|to)\s*\$?\s?(\d+(?:\.\d{1,2})?)"),
+    re.compile(r"\b\d+\s*(?:-|to)\s*(\d+(?:\.\d{1,2})?)\s*(?:bucks|dollars|usd)\b", re.IGNORECASE),
+    re.compile(r"\$\s?(\d+(?:\.\d{1,2})?)"),
+    re.compile(r"\b(\d+(?:\.\d{1,2})?)\s*(?:bucks|dollars|usd)\b", re.IGNORECASE),
+    re.compile(
+        r"\b(?:under|max|maximum|up to|budget(?: of| is)?|below|less than|no more than|around|about)\s+(\d+(?:\.\d{1,2})?)\b",
+        re.IGNORECASE,
+    ),
+]
+URGENCY_PATTERNS = [
+    ("immediate", re.compile(
+        r"\b(?:asap|a\.s\.a\.p|right now|right away|immediately|tonight|today|this (?:morning|afternoon|evening)"
+        r"|in (?:an|1|one|two|2) hours?|emergency|quick(?:ly)?)\b|\bnow\b",
+        re.IGNORECASE,
+    )),
+    ("high", re.compile(
+        r"\b(?:urgent(?:ly)?|tomorrow|soon|this weekend|the weekend|by (?:monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+        r"|next few days|desperate(?:ly)?|fast)\b",
+        re.IGNORECASE,
+    )),
+    ("medium", re.compile(r"\b(?:this week|next week|sometime|in a few days|by next)\b", re.IGNORECASE)),
+    ("low", re.compile(r"\b(?:no rush|whenever|eventually|not urgent|next month|no hurry)\b", re.IGNORECASE)),
+]
+BORROW_RE = re.compile(r"\b(?:borrow|borrowing|rent|renting|lend|loan)\b", re.IGNORECASE)
+BUY_RE = re.compile(r"\b(?:buy|buying|purchase|pay|\$)", re.IGNORECASE)
+SIZE_RE = re.compile(
+    r"\bsize\s+(xxs|xs|s|m|l|xl|xxl|small|medium|large|\d+(?:\.\d)?)\b"
+    r"|\b(x{0,2}-?small|medium|x{0,2}-?large|twin xl)[- ]sized?\b",
+    re.IGNORECASE,
+)
+REASON_RE = re.compile(r"\bfor (?:my|an?|the|upcoming|our)\s+([^,.!?;]+)", re.IGNORECASE)
+ITEM_LEAD_RE = re.compile(
+    r"^\s*(?:(?:hi|hey|urgent|asap)[!,.]*\s+)*(?:i\s+)?(?:really\s+|urgently\s+|desperately\s+)?"
+    r"(?:need|needs|needing|looking for|look for|searching for|want|wanting|anyone have|does anyone have|who has|in need of|seeking"
+    r"|(?:can|could|may) (?:i|someone) (?:borrow|buy|get|rent))\s+"
+    r"(?:to\s+(?:buy|borrow|rent)\s+)?(?:(?:a|an|some|the|my|one|1|two|2)\s+)?",
+    re.IGNORECASE,
+)
+QUOTED_TITLE_RE = re.compile(r"""\s*['"\u201c\u2018]([^'"\u201d\u2019]{3,})['"\u201d\u2019]""")
+ITEM_STOP_RE = re.compile(
+    r"[,.!?;:(]|\s(?:for|by|under|around|about|asap|tonight|today|tomorrow|now|max|that|to|in|size|with|maybe|"
+    r"can|please|preferably|ideally|if|or|and|near|at|on|before|this|next|sometime|willing|must|up)\b",
+    re.IGNORECASE,
+)
+ITEM_FILLER_RE = re.compile(
+    r"(?:(?:(?:brand[- ]new|like[- ]new|very good|gently used|excellent|good|new|used)"
+    r"(?:\s+or\s+(?:brand[- ]new|like[- ]new|very good|gently used|excellent|good|new|used))*\s+condition"
+    r"|cheap|cheapish|affordable|new|used|working|good|decent|nice|quick|quiet|spare|reliable|brand[- ]new|"
+    r"like[- ]new|compact|small|large|big)[\s,]+)+",
+    re.IGNORECASE,
+)
+
+
+def extract_price_max(text: str) -> Optional[float]:
+    for pattern in PRICE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def extract_urgency(text: str) -> str:
+    for label, pattern in URGENCY_PATTERNS:
+        if pattern.search(text):
+            return label
+    return "medium"
+
+
+def extract_location_text(text: str) -> Optional[str]:
+    match = LOCAL_LOCATION_RE.search(text)
+    if match:
+        return re.sub(r"^the\s+", "", match.group(1).strip(), flags=re.IGNORECASE)
+    match = ON_CAMPUS_RE.search(text)
+    return "on campus" if match else None
+
+
+def extract_parsed_item(text: str) -> Tuple[str, int]:
+    """The requested item and the offset in ``text`` where it ends."""
+    lead = ITEM_LEAD_RE.match(text)
+    start = lead.end() if lead else 0
+    filler = ITEM_FILLER_RE.match(text, start)
+    if filler:
+        start = filler.end()
+    remainder = text[start:]
+    quoted = QUOTED_TITLE_RE.match(remainder)
+    if quoted:
+        # A quoted title is the item, plus a following noun ("'Dune' paperback")
+        title = quoted.group(1).strip()
+        noun = re.match(r"\s+(textbook|book|novel|paperback|hardcover)\b", remainder[quoted.end():], re.IGNORECASE)
+        end = start + quoted.end() + (noun.end() if noun else 0)
+        return (f"{title} {noun.group(1)}" if noun else title), end
+    stop = ITEM_STOP_RE.search(remainder)
+    end = start + (stop.start() if stop else len(remainder))
+    item = text[start:end].strip().strip("'\"")
+    words = item.split()
+    return (" ".join(words[:6]) if words else text.strip()[:60]), end
+
+
+def infer_local_category(
+    tokens: List[str], fallback_category: Optional[Callable[[Set[str]], Optional[str]]] = None
+) -> Optional[str]:
+    best_category: Optional[str] = None
+    best_score = 0
+    for category, keywords in LOCAL_CATEGORY_KEYWORDS:
+        score = sum(2 if token in LOCAL_CATEGORY_STRONG_TOKENS else 1 for token in tokens if token in keywords)
+        if score > best_score:
+            best_category, best_score = category, score
+    if best_category:
+        return best_category
+    return fallback_category(set(tokens)) if fallback_category else None
+
+
+def parse_request_locally(
+    text: str, fallback_category: Optional[Callable[[Set[str]], Optional[str]]] = None
+) -> Dict[str, Any]:
+    """
+    Rule-based FLASH_REQUEST parse of ``text`` (same schema as the Gemini
+    parser; see aiatlwinningproject-gemini/src/shared/types.ts).
+
+    ``fallback_category`` maps a token set to a category when none of the
+    campus categories match, e.g. the app's seller-catalogue vocabulary.
+    """
+    text = text or ""
+    lowered = text.lower()
+    item, item_end = extract_parsed_item(text)
+    item_tokens = tokenize(item)
+    category = (
+        infer_local_category(item_tokens, fallback_category)
+        or infer_local_category(tokenize(text), fallback_category)
+        or "Other"
+    )
+
+    wants_borrow = bool(BORROW_RE.search(text))
+    type_preferred = "borrow" if wants_borrow else "buy"
+    type_acceptable = ["borrow", "buy"] if wants_borrow and BUY_RE.search(text) else [type_preferred]
+
+    # Only read condition words when the text is talking about condition
+    conditions: List[str] = []
+    if "condition" in lowered or re.search(r"\b(?:like[- ]new|brand new|gently used)\b", lowered):
+        for match in LOCAL_CONDITION_RE.finditer(lowered):
+            condition = match.group(1).replace("-", " ")
+            if condition not in conditions:
+                conditions.append(condition)
+
+    size_match = SIZE_RE.search(text)
+    color_match = LOCAL_COLOR_RE.search(text)
+    material_match = LOCAL_MATERIAL_RE.search(text)
+    brand_match = LOCAL_BRAND_RE.search(text)
+    product_match = LOCAL_PRODUCT_BRAND_RE.search(text)
+    brand = (
+        LOCAL_BRANDS[brand_match.group(1).lower()] if brand_match
+        else LOCAL_PRODUCT_BRANDS[product_match.group(1).lower()] if product_match
+        else None
+    )
+    reason_match = REASON_RE.search(text, item_end)
+    return {
+        "schema_type": "FLASH_REQUEST",
+        "item_meta": {
+            "parsed_item": item,
+            "category": category,
+            "tags": [],
+        },
+        "item_attributes": {
+            "primary": {
+                "size": next((group for group in size_match.groups() if group), None) if size_match else None,
+                "color": color_match.group(1).lower() if color_match else None,
+                "condition_requested": conditions,
+            },
+            "secondary": {
+                "material": material_match.group(1).lower() if material_match else None,
+                "brand": brand,
+            },
+        },
+        "transaction": {
+            "type_preferred": type_preferred,
+            "type_acceptable": type_acceptable,
+            "price_max": extract_price_max(text),
+        },
+        "context": {
+            "urgency": extract_urgency(text),
+            "reason": reason_match.group(0).strip() if reason_match else None,
+            "original_text": text,
+        },
+        "location": {
+            "text_input": extract_location_text(text),
+            "device_gps": None,
+        },
+    }
@@ -1,6 +1,6 @@
 """MongoDB models for User and SellerProfile."""
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, EmailStr, Field
 from bson import ObjectId
 
@@ -99,17 +99,26 @@ class MessageSchema(BaseModel):
         populate_by_name = True
 
 
+def dm_pair_key(user_a: str, user_b: str) -> str:
+    """Order-independent key for the thread between two users."""
+    return ":".join(sorted((str(user_a), str(user_b))))
+
+
 class MessageThreadSchema(BaseModel):
     """Message thread schema for MongoDB."""
     id: Optional[str] = Field(default=None, alias="_id")
     thread_id: str  # Unique thread identifier
     participant1_id: str  # First participant (current user or user1)
     participant2_id: str  # Second participant (other user or user2)
+    pair_key: Optional[str] = None  # dm_pair_key(participant1_id, participant2_id), unique
     other_user_id: str  # The other user's ID (for easier lookup)
     other_user_name: Optional[str] = None  # Cached name of the other user
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
-    unread_count: int = 0
+    unread_counts: Dict[str, int] = Field(default_factory=dict)  # Unread messages per receiving user
+    last_message_text: Optional[str] = None  # Denormalized summary of the latest message
+    last_message_at: Optional[datetime] = None
+    last_sender_id: Optional[str] = None
     
     class Config:
         populate_by_name = True
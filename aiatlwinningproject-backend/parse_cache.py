@@ -0,0 +1,198 @@
+"""Two-tier (memory LRU + SQLite) cache of Gemini parse results."""
+from __future__ import annotations
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent
+
+# Bump to invalidate every cached parse after a prompt or schema change
+GEMINI_PARSER_VERSION = os.getenv("GEMINI_PARSER_VERSION", "1")
+PARSE_CACHE_TTL_SECONDS = float(os.getenv("PARSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+PARSE_CACHE_MEMORY_ENTRIES = int(os.getenv("PARSE_CACHE_MEMORY_ENTRIES", "1000"))
+PARSE_CACHE_DISK_ENTRIES = int(os.getenv("PARSE_CACHE_DISK_ENTRIES", "50000"))
+# Empty disables the on-disk tier
+PARSE_CACHE_PATH = os.getenv("PARSE_CACHE_PATH", str(ROOT_DIR / "parse_cache.db"))
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_parse_text(text: Any) -> str:
+    """Case- and whitespace-insensitive form of the text sent for parsing."""
+    return WHITESPACE_RE.sub(" ", str(text or "")).strip().casefold()
+
+
+def parse_cache_key(endpoint: str, payload: Dict[str, Any], version: str = GEMINI_PARSER_VERSION) -> str:
+    """
+    Content address of a parse: endpoint, parser version, normalized text
+    and any other payload fields (e.g. the userId embedded in profiles).
+    """
+    extra = {key: value for key, value in payload.items() if key != "text"}
+    material = json.dumps(
+        [endpoint, version, normalize_parse_text(payload.get("text")), extra],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """
+    Parse results by content address: an in-memory LRU in front of a
+    SQLite table that survives restarts.
+
+    Both tiers expire entries after ``ttl_seconds`` and are capped in
+    size; disk hits are promoted into memory.  SQLite work runs in a
+    worker thread so a slow disk never blocks the event loop.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = PARSE_CACHE_PATH,
+        ttl_seconds: float = PARSE_CACHE_TTL_SECONDS,
+        memory_entries: int = PARSE_CACHE_MEMORY_ENTRIES,
+        disk_entries: int = PARSE_CACHE_DISK_ENTRIES,
+    ) -> None:
+        self.path = path or None
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._conn is None:
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS parse_cache ("
+                    " key TEXT PRIMARY KEY,"
+                    " endpoint TEXT NOT NULL,"
+                    " result TEXT NOT NULL,"
+                    " created_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS parse_cache_created ON parse_cache (created_at)")
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                print(f"[WARNING] Parse cache disk tier disabled ({self.path}): {e}")
+                self.path = None
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT result, created_at FROM parse_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] + self.ttl_seconds < time.time():
+                conn.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            return json.loads(row[0])
+
+    def _disk_set(self, key: str, endpoint: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO parse_cache (key, endpoint, result, created_at) VALUES (?, ?, ?, ?)",
+                (key, endpoint, json.dumps(result), time.time()),
+            )
+            self._writes_since_prune += 1
+            # Expire and trim in batches rather than on every write
+            if self._writes_since_prune >= 100:
+                self._writes_since_prune = 0
+                conn.execute("DELETE FROM parse_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+                conn.execute(
+                    "DELETE FROM parse_cache WHERE key IN ("
+                    " SELECT key FROM parse_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_entries,),
+                )
+            conn.commit()
+
+    def _remember(self, key: str, result: Dict[str, Any], stored_at: float) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (stored_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, endpoint: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = parse_cache_key(endpoint, payload)
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] + self.ttl_seconds >= time.time():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                # Callers enrich parses in place; never hand out the cached object
+                return copy.deepcopy(entry[1])
+            del self._memory[key]
+
+        if self.path is not None:
+            try:
+                result = await asyncio.to_thread(self._disk_get, key)
+            except (sqlite3.Error, ValueError) as e:
+                print(f"[WARNING] Parse cache read failed: {e}")
+                result = None
+            if result is not None:
+                self.disk_hits += 1
+                self._remember(key, copy.deepcopy(result), time.time())
+                return result
+
+        self.misses += 1
+        return None
+
+    async def set(self, endpoint: str, payload: Dict[str, Any], result: Dict[str, Any]) -> None:
+        key = parse_cache_key(endpoint, payload)
+        self._remember(key, copy.deepcopy(result), time.time())
+        self.writes += 1
+        if self.path is not None:
+            try:
+                await asyncio.to_thread(self._disk_set, key, endpoint, result)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"[WARNING] Parse cache write failed: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "parserVersion": GEMINI_PARSER_VERSION,
+            "memoryEntries": len(self._memory),
+            "diskEnabled": self.path is not None,
+            "memoryHits": self.memory_hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hitRate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
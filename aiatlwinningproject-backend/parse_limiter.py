@@ -0,0 +1,156 @@
+"""Priority-aware concurrency limiter for outbound Gemini parse calls."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Tuple
+
+PRIORITY_INTERACTIVE = "interactive"  # a user is waiting on the result
+PRIORITY_BACKGROUND = "background"  # registration bios; callers degrade gracefully
+PRIORITY_BULK = "bulk"  # bulk ingestion and seeding
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BULK)
+
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+# Slots only interactive calls may take, so a storm of background work never fills the limiter
+GEMINI_INTERACTIVE_RESERVED = int(os.getenv("GEMINI_INTERACTIVE_RESERVED", "2"))
+GEMINI_MAX_WAIT_SECONDS = {
+    PRIORITY_INTERACTIVE: float(os.getenv("GEMINI_MAX_WAIT_INTERACTIVE_SECONDS", "5")),
+    PRIORITY_BACKGROUND: float(os.getenv("GEMINI_MAX_WAIT_BACKGROUND_SECONDS", "15")),
+    PRIORITY_BULK: float(os.getenv("GEMINI_MAX_WAIT_BULK_SECONDS", "120")),
+}
+
+WAIT_SAMPLES = 512
+
+
+class LimiterTimeout(Exception):
+    def __init__(self, priority: str, waited: float) -> None:
+        super().__init__(f"waited {waited:.1f}s for a {priority} parse slot")
+        self.priority = priority
+        self.waited = waited
+
+
+class PriorityLimiter:
+    """
+    At most ``concurrency`` calls in flight; waiters are served strictly by
+    priority, then first come first served.
+
+    ``reserved`` slots are held back for the highest priority: lower
+    priorities queue once only that many slots remain free.  A call that
+    fans out downstream (a batch parse) takes ``weight`` slots.  Every
+    priority gives up after its own max wait with ``LimiterTimeout``,
+    so callers can fall back instead of piling up behind a slow service.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = GEMINI_MAX_CONCURRENCY,
+        reserved: int = GEMINI_INTERACTIVE_RESERVED,
+        max_wait: Dict[str, float] = GEMINI_MAX_WAIT_SECONDS,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.reserved = min(max(0, reserved), self.concurrency - 1)
+        self.max_wait = dict(max_wait)
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._rank = {priority: rank for rank, priority in enumerate(PRIORITIES)}
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._queued = {priority: 0 for priority in PRIORITIES}
+        self._peak_queued = {priority: 0 for priority in PRIORITIES}
+        self._admitted = {priority: 0 for priority in PRIORITIES}
+        self._timed_out = {priority: 0 for priority in PRIORITIES}
+        self._waits: Dict[str, Deque[float]] = {
+            priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITIES
+        }
+
+    def _capacity(self, rank: int) -> int:
+        return self.concurrency if rank == 0 else self.concurrency - self.reserved
+
+    def _dispatch(self) -> None:
+        while self._waiters:
+            rank, _, weight, waiter = self._waiters[0]
+            if waiter.done():  # gave up while queued
+                heapq.heappop(self._waiters)
+                continue
+            # Capacity only shrinks with rank, so if the head cannot run nobody can
+            if self.in_use + weight > self._capacity(rank):
+                return
+            heapq.heappop(self._waiters)
+            self.in_use += weight
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            waiter.set_result(None)
+
+    def _release(self, weight: int = 1) -> None:
+        self.in_use -= weight
+        self._dispatch()
+
+    def _weight(self, priority: str, weight: int) -> int:
+        # Never more than the priority can ever hold, or the call would wait forever
+        return min(max(1, weight), self._capacity(self._rank[priority]))
+
+    async def acquire(self, priority: str, weight: int = 1) -> None:
+        rank = self._rank[priority]
+        weight = self._weight(priority, weight)
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._order), weight, waiter))
+        self._dispatch()
+
+        started = time.perf_counter()
+        if not waiter.done():
+            self._queued[priority] += 1
+            self._peak_queued[priority] = max(self._peak_queued[priority], self._queued[priority])
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), self.max_wait[priority])
+            except asyncio.TimeoutError:
+                # A slot may have been handed over just as the wait ran out
+                if not waiter.done():
+                    waiter.cancel()
+                    self._timed_out[priority] += 1
+                    raise LimiterTimeout(priority, time.perf_counter() - started) from None
+            except asyncio.CancelledError:
+                if waiter.done():
+                    self._release(weight)
+                else:
+                    waiter.cancel()
+                raise
+            finally:
+                self._queued[priority] -= 1
+        self._admitted[priority] += 1
+        self._waits[priority].append(time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def slot(self, priority: str = PRIORITY_INTERACTIVE, weight: int = 1) -> AsyncIterator[None]:
+        await self.acquire(priority, weight)
+        try:
+            yield
+        finally:
+            self._release(self._weight(priority, weight))
+
+    def stats(self) -> Dict[str, Any]:
+        queues: Dict[str, Any] = {}
+        for priority in PRIORITIES:
+            waits = sorted(self._waits[priority])
+            percentile = lambda fraction: (  # noqa: E731
+                round(waits[min(len(waits) - 1, int(len(waits) * fraction))] * 1000, 2) if waits else None
+            )
+            queues[priority] = {
+                "queued": self._queued[priority],
+                "peakQueued": self._peak_queued[priority],
+                "admitted": self._admitted[priority],
+                "timedOut": self._timed_out[priority],
+                "maxWaitSeconds": self.max_wait[priority],
+                "waitMsP50": percentile(0.5),
+                "waitMsP95": percentile(0.95),
+            }
+        return {
+            "concurrency": self.concurrency,
+            "interactiveReserved": self.reserved,
+            "inUse": self.in_use,
+            "peakInUse": self.peak_in_use,
+            "queues": queues,
+        }
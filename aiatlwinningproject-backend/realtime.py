@@ -0,0 +1,166 @@
+"""WebSocket push channel: per-user connection registry on top of a pub/sub broker."""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+# Events buffered per connection before a slow client is dropped (it reconnects and resyncs)
+CLIENT_QUEUE_SIZE = int(os.getenv("REALTIME_CLIENT_QUEUE_SIZE", "100"))
+
+EventHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def user_topic(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class InProcessBroker:
+    """
+    Pub/sub that delivers events to subscribers in this process only.
+
+    This is the single-worker stand-in.  A broker that fans out across
+    workers (Redis pub/sub, a Mongo change stream, ...) implements the same
+    ``start``/``close``/``subscribe``/``publish`` methods: ``publish`` sends
+    to the shared transport and each worker's listener calls the
+    subscribed handlers for events it receives.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: List[EventHandler] = []
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def subscribe(self, handler: EventHandler) -> None:
+        self._handlers.append(handler)
+
+    async def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        for handler in self._handlers:
+            await handler(topic, event)
+
+
+class ClientConnection:
+    """One accepted WebSocket with its own outgoing queue and sender."""
+
+    def __init__(self, user_id: str, websocket: WebSocket, queue_size: int = CLIENT_QUEUE_SIZE) -> None:
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Queue an event without waiting; False if the client has fallen behind."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.closed = True
+            # Wake the sender so it notices the connection is being dropped
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                event = await self.queue.get()
+                if event is None:
+                    # 1013 "try again later": the client reconnects and refetches
+                    await self.websocket.close(code=1013)
+                    return
+                await self.websocket.send_json(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The receive loop sees the disconnect and ends the session
+            print(f"[WARNING] WebSocket send to {self.user_id} failed: {e}")
+
+    async def run(self) -> None:
+        """Pump events to the client until it disconnects or falls behind."""
+        sender = asyncio.create_task(self._send_loop())
+        try:
+            while True:
+                frame = await self.websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", 1000))
+                try:
+                    message = json.loads(frame.get("text") or frame.get("bytes") or "")
+                except ValueError:
+                    # Not JSON: ignore the frame rather than ending the session
+                    continue
+                # Application-level keep-alive for proxies that drop idle sockets
+                if isinstance(message, dict) and message.get("type") == "ping":
+                    self.enqueue({"type": "pong"})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.closed = True
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+
+
+class ConnectionManager:
+    """
+    Tracks open WebSockets by user and routes broker events to them.
+
+    Handlers publish through ``publish_to_user`` rather than
+    writing to sockets directly, so the same call reaches users connected
+    to other workers once the broker spans processes.  Delivery only
+    enqueues; a slow client never blocks the request that published.
+    """
+
+    def __init__(self, broker: Optional[InProcessBroker] = None) -> None:
+        self.broker = broker or InProcessBroker()
+        self.connections: Dict[str, Set[ClientConnection]] = {}
+        self.delivered = 0
+        self.dropped = 0
+        self.broker.subscribe(self._deliver)
+
+    async def start(self) -> None:
+        await self.broker.start()
+
+    async def close(self) -> None:
+        await self.broker.close()
+
+    def connect(self, user_id: str, websocket: WebSocket) -> ClientConnection:
+        client = ClientConnection(user_id, websocket)
+        self.connections.setdefault(user_id, set()).add(client)
+        return client
+
+    def disconnect(self, client: ClientConnection) -> None:
+        clients = self.connections.get(client.user_id)
+        if clients is None:
+            return
+        clients.discard(client)
+        if not clients:
+            del self.connections[client.user_id]
+
+    async def publish_to_user(self, user_id: str, event: Dict[str, Any]) -> None:
+        await self.broker.publish(user_topic(user_id), event)
+
+    async def _deliver(self, topic: str, event: Dict[str, Any]) -> None:
+        if not topic.startswith("user:"):
+            return
+        targets = list(self.connections.get(topic[len("user:"):], ()))
+        for client in targets:
+            if client.enqueue(event):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self.connections),
+            "connections": sum(len(clients) for clients in self.connections.values()),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
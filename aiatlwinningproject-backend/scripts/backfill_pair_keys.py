@@ -0,0 +1,101 @@
+"""
+Backfill the canonical ``pair_key`` on message_threads.
+
+DM lookup and creation find threads by ``pair_key`` (the two participant
+IDs, sorted), so threads created before it existed are invisible to
+/api/dm until this runs.  Threads are processed oldest first; when a
+pair already has several threads, the oldest one gets the key and the
+others are left without it (they still show up in the inbox) and are
+reported as duplicates.  The script is idempotent.
+
+Usage (from aiatlwinningproject-backend/, MONGODB_URI/DB_NAME as for the app):
+    python scripts/backfill_pair_keys.py [--batch-size 500] [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Set, Tuple
+
+from pymongo import ASCENDING, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from database import DB_NAME, INDEXES, MONGODB_URI  # noqa: E402
+from models import dm_pair_key  # noqa: E402
+
+
+def backfill(db, batch_size: int, dry_run: bool) -> Tuple[int, int]:
+    updated = duplicates = 0
+    seen: Set[str] = set()
+    cursor = db.message_threads.find(
+        {"pair_key": {"$exists": False}},
+        {"thread_id": 1, "participant1_id": 1, "participant2_id": 1},
+    ).sort("created_at", ASCENDING).batch_size(batch_size)
+
+    operations = []
+    for thread_doc in cursor:
+        participant1_id = thread_doc.get("participant1_id")
+        participant2_id = thread_doc.get("participant2_id")
+        if not participant1_id or not participant2_id:
+            continue
+        pair_key = dm_pair_key(participant1_id, participant2_id)
+        if pair_key in seen:
+            duplicates += 1
+            print(f"[WARNING] Thread {thread_doc.get('thread_id')} duplicates pair {pair_key}")
+            continue
+        seen.add(pair_key)
+        operations.append(UpdateOne(
+            {"_id": thread_doc["_id"], "pair_key": {"$exists": False}},
+            {"$set": {"pair_key": pair_key}},
+        ))
+        if len(operations) >= batch_size:
+            batch_updated, batch_duplicates = apply_batch(db, operations, dry_run)
+            updated += batch_updated
+            duplicates += batch_duplicates
+            operations = []
+    if operations:
+        batch_updated, batch_duplicates = apply_batch(db, operations, dry_run)
+        updated += batch_updated
+        duplicates += batch_duplicates
+    return updated, duplicates
+
+
+def apply_batch(db, operations, dry_run: bool) -> Tuple[int, int]:
+    if dry_run:
+        print(f"[DRY RUN] Would update {len(operations)} threads")
+        return len(operations), 0
+    try:
+        result = db.message_threads.bulk_write(operations, ordered=False)
+        return result.modified_count, 0
+    except BulkWriteError as e:
+        # A pair already keyed by a newer thread (created after deploy) keeps that thread
+        details = e.details
+        duplicate_errors = [err for err in details.get("writeErrors", []) if err.get("code") == 11000]
+        if len(duplicate_errors) != len(details.get("writeErrors", [])):
+            raise
+        return details.get("nModified", 0), len(duplicate_errors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGODB_URI)
+    try:
+        db = client[DB_NAME]
+        if not args.dry_run:
+            db.message_threads.create_indexes(INDEXES["message_threads"])
+        updated, duplicates = backfill(db, args.batch_size, args.dry_run)
+        print(f"[OK] Backfilled pair_key on {updated} threads ({duplicates} duplicate threads left unkeyed)")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Backfill the denormalized last-message summary on message_threads.
+
+Threads created before the summary existed have no ``last_message_at``
+field, which makes /api/messages fall back to querying ``messages`` for
+them.  This script sets ``last_message_text``, ``last_message_at`` and
+``last_sender_id`` from each thread's newest message (or None for empty
+threads).  It is idempotent and only touches threads missing the field.
+
+Usage (from aiatlwinningproject-backend/, MONGODB_URI/DB_NAME as for the app):
+    python scripts/backfill_thread_summaries.py [--batch-size 500] [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from pymongo import MongoClient, UpdateOne
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from database import DB_NAME, MONGODB_URI  # noqa: E402
+
+
+def backfill(db, batch_size: int, dry_run: bool) -> int:
+    updated = 0
+    cursor = db.message_threads.find(
+        {"last_message_at": {"$exists": False}}, {"thread_id": 1}
+    ).batch_size(batch_size)
+
+    batch = []
+    for thread_doc in cursor:
+        if thread_doc.get("thread_id"):
+            batch.append(thread_doc["thread_id"])
+        if len(batch) >= batch_size:
+            updated += backfill_batch(db, batch, dry_run)
+            batch = []
+    if batch:
+        updated += backfill_batch(db, batch, dry_run)
+    return updated
+
+
+def backfill_batch(db, thread_ids, dry_run: bool) -> int:
+    latest = {
+        entry["_id"]: entry
+        for entry in db.messages.aggregate([
+            {"$match": {"thread_id": {"$in": thread_ids}}},
+            {"$sort": {"thread_id": 1, "timestamp": -1}},
+            {"$group": {
+                "_id": "$thread_id",
+                "text": {"$first": "$text"},
+                "timestamp": {"$first": "$timestamp"},
+                "sender_id": {"$first": "$sender_id"},
+            }},
+        ])
+    }
+
+    operations = []
+    for thread_id in thread_ids:
+        entry = latest.get(thread_id) or {}
+        operations.append(UpdateOne(
+            {"thread_id": thread_id, "last_message_at": {"$exists": False}},
+            {"$set": {
+                "last_message_text": entry.get("text"),
+                "last_message_at": entry.get("timestamp"),
+                "last_sender_id": entry.get("sender_id"),
+            }},
+        ))
+
+    if dry_run:
+        print(f"[DRY RUN] Would update {len(operations)} threads")
+        return len(operations)
+    result = db.message_threads.bulk_write(operations, ordered=False)
+    print(f"[OK] Updated {result.modified_count} threads")
+    return result.modified_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGODB_URI)
+    try:
+        total = backfill(client[DB_NAME], args.batch_size, args.dry_run)
+        print(f"[OK] Backfilled last-message summaries on {total} threads")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
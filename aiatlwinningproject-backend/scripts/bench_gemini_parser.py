@@ -0,0 +1,144 @@
+"""
+Benchmark call_gemini_parser against the Gemini service or the stub.
+
+Sends ``--calls`` interactive parses of synthetic flash-request texts
+with ``--concurrency`` in flight.  ``--storm`` adds that many
+background profile parses (a registration storm), all at once.  For
+each priority it reports latency percentiles and outcomes by status
+(503 while the circuit breaker is open or the limiter queue wait ran
+out, 502 when the service is unreachable, ...), then the pooled
+client, limiter, breaker and parse-cache stats.  ``--repeat`` re-sends
+texts so a share of calls hit the cache.
+The cache is disabled on disk for the run, so results do not leak into
+the backend's real parse_cache.db.
+
+Start the stub in one shell, then run the benchmark in another:
+
+    python scripts/gemini_stub.py --port 3001 --latency-ms 800 --error-rate 0.2
+    GEMINI_SERVICE_URL=http://127.0.0.1:3001 \\
+        python scripts/bench_gemini_parser.py --calls 500 --concurrency 32 --repeat 0.3
+
+    # Interactive tail latency while 300 registrations hit the parser
+    GEMINI_SERVICE_URL=http://127.0.0.1:3001 \\
+        python scripts/bench_gemini_parser.py --calls 100 --concurrency 4 --storm 300
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+os.environ.setdefault("PARSE_CACHE_PATH", "")
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app as service  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+
+def load_texts(data_dir: Path) -> List[str]:
+    texts = []
+    for path in sorted(data_dir.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as fh:
+            flash_request = json.load(fh).get("flash_request") or {}
+        text = (flash_request.get("context") or {}).get("original_text")
+        if text:
+            texts.append(text)
+    return texts
+
+
+def summarize(label: str, latencies: List[float], outcomes: Counter) -> None:
+    if not latencies:
+        return
+    latencies.sort()
+    to_ms = lambda seconds: seconds * 1000  # noqa: E731
+    print(
+        f"{label + ':':<14} p50 {to_ms(latencies[len(latencies) // 2]):.1f} ms, "
+        f"p95 {to_ms(latencies[max(0, int(len(latencies) * 0.95) - 1)]):.1f} ms, "
+        f"max {to_ms(latencies[-1]):.1f} ms  {dict(outcomes)}"
+    )
+
+
+async def run(calls: int, concurrency: int, repeat: float, storm: int, data_dir: Path) -> None:
+    texts = load_texts(data_dir)
+    rng = random.Random(7)
+    sent: List[str] = []
+    workload = []
+    for i in range(calls):
+        if sent and rng.random() < repeat:
+            workload.append(rng.choice(sent))
+        else:
+            # Suffix keeps texts unique once the synthetic set runs out
+            text = texts[i % len(texts)] + ("" if i < len(texts) else f" ({i})")
+            sent.append(text)
+            workload.append(text)
+
+    latencies: Dict[str, List[float]] = {"interactive": [], "background": []}
+    outcomes: Dict[str, Counter] = {"interactive": Counter(), "background": Counter()}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def parse(kind: str, endpoint: str, payload: Dict[str, str], priority: str) -> None:
+        started = time.perf_counter()
+        try:
+            await service.call_gemini_parser(endpoint, payload, priority=priority)
+            outcomes[kind]["ok"] += 1
+        except HTTPException as exc:
+            outcomes[kind][str(exc.status_code)] += 1
+        latencies[kind].append(time.perf_counter() - started)
+
+    async def interactive(text: str) -> None:
+        async with semaphore:
+            await parse("interactive", "/api/parse-request", {"text": text}, service.PRIORITY_INTERACTIVE)
+
+    async def registration(i: int) -> None:
+        bio = f"{texts[i % len(texts)]} (bench user {i})"
+        await parse(
+            "background",
+            "/api/parse-profile",
+            {"text": bio, "userId": f"bench_user_{i}"},
+            service.PRIORITY_BACKGROUND,
+        )
+
+    await service.gemini_http.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(
+            *(registration(i) for i in range(storm)),
+            *(interactive(text) for text in workload),
+        )
+    elapsed = time.perf_counter() - started
+    await service.gemini_http.close()
+
+    print(f"calls:         {calls} interactive (concurrency {concurrency}, repeat {repeat:.0%}), {storm} background")
+    print(f"throughput:    {(calls + storm) / elapsed:.1f} parses/s")
+    summarize("interactive", latencies["interactive"], outcomes["interactive"])
+    summarize("background", latencies["background"], outcomes["background"])
+    print(f"limiter:       {service.gemini_limiter.stats()}")
+    print(f"breaker:       {service.gemini_breaker.stats()}")
+    print(f"parse cache:   {service.parse_cache.stats()}")
+    print(f"http client:   {service.gemini_http.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=float, default=0.0, help="share of calls re-sending an earlier text")
+    parser.add_argument("--storm", type=int, default=0, help="background profile parses fired alongside")
+    parser.add_argument("--data-dir", type=Path, default=ROOT_DIR / "synthetic-data")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.concurrency, args.repeat, args.storm, args.data_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark POST /api/auth/login under a storm of concurrent logins.
+
+Runs the FastAPI app in-process (httpx ASGI transport) against the
+MongoDB configured by MONGODB_URI/DB_NAME.  A throwaway user is created,
+``--logins`` logins are fired with ``--concurrency`` in flight, and a
+ticker on the same event loop measures how late its 10ms sleeps wake
+up: the event-loop lag every other request on the worker would see.
+The benchmark user is deleted afterwards.
+
+``--inline`` checks passwords on the event loop, the way login did
+before bcrypt moved to its thread pool, for a before/after comparison:
+
+    MONGODB_URI=mongodb://localhost:27017 DB_NAME=bench \\
+        python scripts/bench_login_storm.py --logins 200 --concurrency 50
+    MONGODB_URI=mongodb://localhost:27017 DB_NAME=bench \\
+        python scripts/bench_login_storm.py --logins 200 --concurrency 50 --inline
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app as service  # noqa: E402
+import auth  # noqa: E402
+import database  # noqa: E402
+
+TICK_SECONDS = 0.01
+
+
+async def measure_lag(lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - started - TICK_SECONDS)
+
+
+async def run(logins: int, concurrency: int, inline: bool) -> None:
+    await database.connect_db()
+    if database.db is None:
+        raise SystemExit("MongoDB is not reachable; set MONGODB_URI")
+    db = database.db
+
+    if inline:
+        async def verify_on_loop(plain_password: str, hashed_password: str) -> bool:
+            return auth.verify_password(plain_password, hashed_password)
+
+        service.verify_password_async = verify_on_loop
+
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    password = "bench-password"
+    await db.users.insert_one({
+        "name": "Login Bench",
+        "email": email,
+        "password": await auth.hash_password_async(password),
+        "created_at": datetime.utcnow(),
+    })
+
+    latencies: List[float] = []
+    lags: List[float] = []
+    stop = asyncio.Event()
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/auth/login", json={"email": email, "password": password})
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        await login()  # warm up connections and the bcrypt pool
+        latencies.clear()
+        ticker = asyncio.create_task(measure_lag(lags, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await ticker
+
+    await db.users.delete_one({"email": email})
+    await database.close_db()
+    auth.shutdown_password_pool()
+
+    latencies.sort()
+    lags.sort()
+    to_ms = lambda seconds: seconds * 1000  # noqa: E731
+    mode = "inline on the event loop" if inline else f"{auth.PASSWORD_HASH_WORKERS} bcrypt threads"
+    print(f"logins:        {logins} (concurrency {concurrency}, rounds {auth.BCRYPT_ROUNDS}, {mode})")
+    print(f"throughput:    {logins / elapsed:.1f} logins/s")
+    print(f"latency p50:   {to_ms(statistics.median(latencies)):.1f} ms")
+    print(f"latency p95:   {to_ms(latencies[int(len(latencies) * 0.95) - 1]):.1f} ms")
+    print(f"loop lag p50:  {to_ms(statistics.median(lags)):.1f} ms")
+    print(f"loop lag p99:  {to_ms(lags[max(0, int(len(lags) * 0.99) - 1)]):.1f} ms")
+    print(f"loop lag max:  {to_ms(lags[-1]):.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument("--inline", action="store_true", help="verify passwords on the event loop")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.concurrency, args.inline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark listing index and trigram index build/query cost at catalog scale.
+
+Synthesises a catalog from campus_sellers.json (titles get random
+suffix words so the vocabulary grows with the catalog) and measures:
+
+- ListingIndex and TrigramIndex build time
+- fuzzy query latency for misspelled titles (p50 / p95 / max)
+
+Usage (from aiatlwinningproject-backend/):
+    python scripts/bench_search_index.py --listings 100000
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from listing_index import ListingIndex  # noqa: E402
+from search_index import TrigramIndex  # noqa: E402
+
+
+def synthesize_sellers(target_listings: int, rng: random.Random) -> List[Dict[str, Any]]:
+    with open(ROOT_DIR / "campus_sellers.json", "r", encoding="utf-8") as fh:
+        base = json.load(fh)["sellers"]
+
+    extra_words = [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+        for _ in range(max(target_listings // 20, 100))
+    ]
+
+    sellers: List[Dict[str, Any]] = []
+    produced = 0
+    copy_number = 0
+    while produced < target_listings:
+        for seller in base:
+            clone = copy.deepcopy(seller)
+            clone["user_id"] = f"{seller['user_id']}_{copy_number}"
+            for listing in clone.get("current_item_listings", []):
+                listing["parsed_item"] = f"{listing['parsed_item']} {rng.choice(extra_words)}"
+            produced += len(clone.get("current_item_listings", []))
+            sellers.append(clone)
+            if produced >= target_listings:
+                break
+        copy_number += 1
+    return sellers
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    position = rng.randrange(1, len(word) - 1)
+    operation = rng.choice(["drop", "swap", "replace"])
+    if operation == "drop":
+        return word[:position] + word[position + 1:]
+    if operation == "swap":
+        return word[:position - 1] + word[position] + word[position - 1] + word[position + 1:]
+    return word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sellers = synthesize_sellers(args.listings, rng)
+
+    start = time.perf_counter()
+    index = ListingIndex(sellers)
+    listing_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trigrams = TrigramIndex.from_listing_index(index)
+    trigram_build = time.perf_counter() - start
+
+    queries = [
+        " ".join(misspell(word, rng) for word in rng.choice(index.titles).split())
+        for _ in range(args.queries)
+    ]
+    timings: List[float] = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        mask, _ = trigrams.search(query)
+        timings.append(time.perf_counter() - start)
+        hits += bool(mask.any())
+
+    print(f"listings:            {len(index):,}")
+    print(f"vocabulary words:    {len(trigrams.words):,}")
+    print(f"trigrams:            {len(trigrams.trigram_words):,}")
+    print(f"ListingIndex build:  {listing_build * 1000:.1f} ms")
+    print(f"TrigramIndex build:  {trigram_build * 1000:.1f} ms")
+    print(f"fuzzy queries:       {len(queries)} ({hits} with results)")
+    print(f"query p50:           {percentile(timings, 0.50) * 1000:.2f} ms")
+    print(f"query p95:           {percentile(timings, 0.95) * 1000:.2f} ms")
+    print(f"query max:           {max(timings) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
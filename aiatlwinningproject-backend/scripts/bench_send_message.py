@@ -0,0 +1,99 @@
+"""
+Benchmark POST /api/messages/{thread_id} throughput for one worker.
+
+Runs the FastAPI app in-process (httpx ASGI transport, no network hop to
+the app) against the MongoDB configured by MONGODB_URI/DB_NAME, sends
+``--messages`` messages with ``--concurrency`` in flight and reports
+messages/sec and latency percentiles.  The benchmark thread and its
+messages are deleted afterwards.
+
+Run it on two checkouts to compare send paths, e.g. against a local
+mongod with and without MESSAGE_WRITE_CONCERN=majority:
+
+    MONGODB_URI=mongodb://localhost:27017 DB_NAME=bench \\
+        python scripts/bench_send_message.py --messages 2000 --concurrency 16
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import app as service  # noqa: E402
+import database  # noqa: E402
+from auth import create_access_token  # noqa: E402
+
+
+async def run(messages: int, concurrency: int) -> None:
+    await database.connect_db()
+    if database.db is None:
+        raise SystemExit("MongoDB is not reachable; set MONGODB_URI")
+    db = database.db
+
+    thread_id = f"bench-{uuid.uuid4()}"
+    sender, receiver = "bench_sender", "bench_receiver"
+    await db.message_threads.insert_one({
+        "thread_id": thread_id,
+        "participant1_id": sender,
+        "participant2_id": receiver,
+        "other_user_id": receiver,
+        "last_message_text": None,
+        "last_message_at": None,
+        "last_sender_id": None,
+    })
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': sender})}"}
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def send(i: int) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    f"/api/messages/{thread_id}", json={"text": f"bench message {i}"}, headers=headers
+                )
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        # The send path logs every message; keep that out of the measurement output
+        with contextlib.redirect_stdout(io.StringIO()):
+            await send(-1)  # warm up connections
+            latencies.clear()
+            started = time.perf_counter()
+            await asyncio.gather(*(send(i) for i in range(messages)))
+            elapsed = time.perf_counter() - started
+
+    await db.messages.delete_many({"thread_id": thread_id})
+    await db.message_threads.delete_one({"thread_id": thread_id})
+    await database.close_db()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"messages:      {messages} (concurrency {concurrency})")
+    print(f"throughput:    {messages / elapsed:.0f} msg/s")
+    print(f"latency p50:   {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"latency p95:   {p95 * 1000:.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(run(args.messages, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
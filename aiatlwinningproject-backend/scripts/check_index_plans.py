@@ -0,0 +1,110 @@
+"""
+Check that the service's hot queries are served by the registry indexes.
+
+Creates the indexes from ``database.INDEXES`` (idempotent), runs
+``explain`` on each hot query and fails if any winning plan still
+contains a COLLSCAN.  Point it at a local mongod to use it as a
+pre-deploy check; the sample values do not need to exist.
+
+``--usage`` instead reports ``$indexStats`` for every registry
+collection: how often each index has served a query since the server
+loaded it, e.g. to find unused indexes on production.
+
+Usage (from aiatlwinningproject-backend/):
+    MONGODB_URI=mongodb://localhost:27017 DB_NAME=flashrequest_check \\
+        python scripts/check_index_plans.py
+    python scripts/check_index_plans.py --usage
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from database import DB_NAME, INDEXES, MONGODB_URI  # noqa: E402
+from models import dm_pair_key  # noqa: E402
+
+USER_ID = "507f1f77bcf86cd799439011"
+OTHER_USER_ID = "507f191e810c19729de860ea"
+
+
+def plan_stages(plan: Dict[str, Any]) -> Set[str]:
+    """Every stage name in a winning plan tree (including $or branches)."""
+    stages = {plan.get("stage", "")}
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages |= plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages |= plan_stages(child)
+    return stages
+
+
+def winning_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    planner = explain.get("queryPlanner") or explain["stages"][0]["$cursor"]["queryPlanner"]
+    return planner["winningPlan"]
+
+
+def hot_queries(db) -> List[tuple]:
+    now = datetime.utcnow()
+    return [
+        ("thread history page", db.messages.find({
+            "thread_id": "sample-thread",
+            "$or": [
+                {"timestamp": {"$lt": now}},
+                {"timestamp": now, "_id": {"$lt": ObjectId()}},
+            ],
+        }).sort([("timestamp", -1), ("_id", -1)]).limit(51)),
+        ("inbox threads", db.message_threads.find({
+            "$or": [{"participant1_id": USER_ID}, {"participant2_id": USER_ID}],
+        }).sort("updated_at", -1)),
+        ("thread by id", db.message_threads.find({"thread_id": "sample-thread"})),
+        ("DM lookup", db.message_threads.find({"pair_key": dm_pair_key(USER_ID, OTHER_USER_ID)}).limit(1)),
+        ("login by email", db.users.find({"email": "someone@example.edu"}).limit(1)),
+        ("seller profile by user", db.seller_profiles.find({"user_id": USER_ID}).limit(1)),
+    ]
+
+
+def print_index_usage(db) -> None:
+    for collection in INDEXES:
+        print(collection)
+        for stat in db[collection].aggregate([{"$indexStats": {}}]):
+            accesses = stat.get("accesses", {})
+            print(f"    {stat.get('name'):<40} {int(accesses.get('ops', 0)):>10} ops since {accesses.get('since')}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--usage", action="store_true", help="report index usage instead of checking plans")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGODB_URI)
+    db = client[DB_NAME]
+    if args.usage:
+        print_index_usage(db)
+        client.close()
+        return 0
+
+    for collection, indexes in INDEXES.items():
+        db[collection].create_indexes(indexes)
+
+    failures = 0
+    for label, cursor in hot_queries(db):
+        stages = plan_stages(winning_plan(cursor.explain()))
+        ok = "COLLSCAN" not in stages
+        failures += not ok
+        print(f"{'[OK]' if ok else '[ERROR]'} {label}: {', '.join(sorted(s for s in stages if s))}")
+
+    client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
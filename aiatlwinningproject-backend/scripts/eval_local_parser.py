@@ -0,0 +1,142 @@
+"""
+Evaluate the local rule-based request parser against Gemini's output.
+
+Every ``synthetic-data/*.json`` file carries a ``flash_request`` that was
+produced by the Gemini parser from its ``context.original_text``.  This
+re-parses each text with ``parse_request_locally`` and reports, per
+field, how often the two agree (rows where Gemini left the field null
+are skipped for category, urgency and transaction type), plus the
+parser's per-call latency.  The parser runs without the app's
+seller-catalogue category fallback, so only ``local_parser`` is loaded.
+
+Usage (from aiatlwinningproject-backend/):
+    python scripts/eval_local_parser.py [--show-misses 5]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from local_parser import parse_request_locally, tokenize  # noqa: E402
+
+
+def field(parsed: Dict[str, Any], path: str) -> Any:
+    value: Any = parsed
+    for key in path.split("."):
+        value = (value or {}).get(key)
+    return value
+
+
+def normalized(value: Any) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    return str(value).strip().lower()
+
+
+def item_f1(expected: Any, actual: Any) -> float:
+    expected_tokens = set(tokenize(expected))
+    actual_tokens = set(tokenize(actual))
+    if not expected_tokens and not actual_tokens:
+        return 1.0
+    overlap = len(expected_tokens & actual_tokens)
+    if not overlap:
+        return 0.0
+    precision = overlap / len(actual_tokens)
+    recall = overlap / len(expected_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+
+def exact(expected: Any, actual: Any) -> float:
+    return float(normalized(expected) == normalized(actual))
+
+
+def same_price(expected: Any, actual: Any) -> float:
+    if expected is None or actual is None:
+        return float(expected is None and actual is None)
+    return float(abs(float(expected) - float(actual)) < 0.01)
+
+
+def same_presence(expected: Any, actual: Any) -> float:
+    return float((normalized(expected) is None) == (normalized(actual) is None))
+
+
+# (label, path, scorer, skip rows where Gemini's value is null)
+CHECKS: List[Tuple[str, str, Callable[[Any, Any], float], bool]] = [
+    ("category", "item_meta.category", exact, True),
+    ("parsed_item (token F1)", "item_meta.parsed_item", item_f1, False),
+    ("urgency", "context.urgency", exact, True),
+    ("price_max", "transaction.price_max", same_price, False),
+    ("type_preferred", "transaction.type_preferred", exact, True),
+    ("location given", "location.text_input", same_presence, False),
+    ("color", "item_attributes.primary.color", exact, False),
+    ("brand", "item_attributes.secondary.brand", exact, False),
+]
+
+
+def load_requests(data_dir: Path) -> List[Dict[str, Any]]:
+    requests = []
+    for path in sorted(data_dir.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as fh:
+            flash_request = json.load(fh).get("flash_request")
+        if flash_request and field(flash_request, "context.original_text"):
+            requests.append(flash_request)
+    return requests
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=ROOT_DIR / "synthetic-data")
+    parser.add_argument("--show-misses", type=int, default=0, help="print this many disagreements per field")
+    args = parser.parse_args()
+
+    references = load_requests(args.data_dir)
+    if not references:
+        print(f"[ERROR] No flash requests found in {args.data_dir}")
+        return 1
+
+    scores: Dict[str, List[float]] = defaultdict(list)
+    misses: Dict[str, List[str]] = defaultdict(list)
+    latencies: List[float] = []
+    for reference in references:
+        text = reference["context"]["original_text"]
+        started = time.perf_counter()
+        parsed = parse_request_locally(text)
+        latencies.append(time.perf_counter() - started)
+
+        for label, path, scorer, skip_null in CHECKS:
+            expected, actual = field(reference, path), field(parsed, path)
+            if skip_null and normalized(expected) is None:
+                continue
+            score = scorer(expected, actual)
+            scores[label].append(score)
+            if score < 1.0 and len(misses[label]) < args.show_misses:
+                misses[label].append(f"    {text!r}\n      gemini={expected!r} local={actual!r}")
+
+    print(f"Compared {len(references)} synthetic flash requests against Gemini output\n")
+    print(f"{'field':<24} {'rows':>6} {'agreement':>10}")
+    for label, _, _, _ in CHECKS:
+        values = scores[label]
+        agreement = sum(values) / len(values) if values else 0.0
+        print(f"{label:<24} {len(values):>6} {agreement:>9.1%}")
+        for line in misses[label]:
+            print(line)
+
+    latencies.sort()
+    to_us = lambda seconds: seconds * 1_000_000  # noqa: E731
+    print(
+        f"\nLatency per parse: p50 {to_us(latencies[len(latencies) // 2]):.0f}us, "
+        f"p95 {to_us(latencies[int(len(latencies) * 0.95)]):.0f}us, max {to_us(latencies[-1]):.0f}us"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Offline stand-in for the aiatlwinningproject-gemini parsing service.
+
+Serves the same routes as the real service (``/api/parse-request``,
+``/api/parse-profile`` and their ``/batch`` variants) without calling
+Gemini.  Parses come from ``synthetic-data/``:
+
+* a text that matches a synthetic record's ``context.original_text``
+  (case- and whitespace-insensitive) returns that record's parse;
+* any other text returns the record sharing the most words with it
+  (ties broken by a hash of the text), with ``original_text`` (and
+  ``user_id`` for profiles) swapped in, so the same text always gets
+  the same, roughly on-topic answer.
+
+Latency, errors and timeouts are injected per call, so the backend's
+pooled client, circuit breaker and parse cache can be exercised and
+benchmarked fully offline.  Point the backend at it with
+``GEMINI_SERVICE_URL=http://127.0.0.1:3001``.
+
+Usage (from aiatlwinningproject-backend/):
+    python scripts/gemini_stub.py --latency-ms 800 --jitter 0.4 --error-rate 0.05
+
+    # Gemini goes quiet: a third of calls hang for 30s
+    python scripts/gemini_stub.py --timeout-rate 0.33 --timeout-seconds 30
+
+Settings can also be changed while it runs, e.g. to trip the breaker
+mid-benchmark:
+    curl -X POST localhost:3001/stub/config -H 'Content-Type: application/json' \\
+        -d '{"error_rate": 1.0}'
+``GET /stub/stats`` reports call counts and the active settings.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import random
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+WHITESPACE_RE = re.compile(r"\s+")
+WORD_RE = re.compile(r"[a-z0-9]+")
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_CONCURRENCY = max(1, int(os.getenv("BATCH_CONCURRENCY", "4")))
+
+
+@dataclass
+class StubSettings:
+    # Median latency of one parse; lognormal spread around it when jitter > 0
+    latency_ms: float = float(os.getenv("GEMINI_STUB_LATENCY_MS", "600"))
+    jitter: float = float(os.getenv("GEMINI_STUB_JITTER", "0.3"))
+    # Share of parses answered with a 500 after the usual latency
+    error_rate: float = float(os.getenv("GEMINI_STUB_ERROR_RATE", "0"))
+    # Share of parses that stall for timeout_seconds before answering
+    timeout_rate: float = float(os.getenv("GEMINI_STUB_TIMEOUT_RATE", "0"))
+    timeout_seconds: float = float(os.getenv("GEMINI_STUB_TIMEOUT_SECONDS", "30"))
+    seed: Optional[int] = None
+
+
+def normalize(text: Any) -> str:
+    return WHITESPACE_RE.sub(" ", str(text or "")).strip().casefold()
+
+
+def stable_index(text: str, size: int) -> int:
+    digest = hashlib.sha256(normalize(text).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % size
+
+
+def words(*values: Any) -> Set[str]:
+    found: Set[str] = set()
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            found |= words(*value)
+        elif value:
+            found.update(word for word in WORD_RE.findall(str(value).lower()) if len(word) > 2)
+    return found
+
+
+class SyntheticParses:
+    """Canned request and profile parses loaded from ``synthetic-data/``."""
+
+    def __init__(self, data_dir: Path) -> None:
+        self.requests: List[Tuple[Set[str], Dict[str, Any]]] = []
+        self.profiles: List[Tuple[Set[str], Dict[str, Any]]] = []
+        self.requests_by_text: Dict[str, Dict[str, Any]] = {}
+        self.profiles_by_text: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(data_dir.glob("*.json")):
+            with open(path, "r", encoding="utf-8") as fh:
+                record = json.load(fh)
+            for parse, pool, by_text in (
+                (record.get("flash_request"), self.requests, self.requests_by_text),
+                (record.get("seller_profile"), self.profiles, self.profiles_by_text),
+            ):
+                if not parse:
+                    continue
+                if isinstance(parse.get("context"), str):
+                    # A few hand-written records flatten context to its text
+                    parse["context"] = {"original_text": parse["context"]}
+                text = (parse.get("context") or {}).get("original_text")
+                pool.append((
+                    words(
+                        text,
+                        (parse.get("item_meta") or {}).get("parsed_item"),
+                        (parse.get("item_meta") or {}).get("tags"),
+                        parse.get("profile_keywords"),
+                    ),
+                    parse,
+                ))
+                text = normalize(text)
+                if text:
+                    by_text.setdefault(text, parse)
+        if not self.requests or not self.profiles:
+            raise SystemExit(f"[ERROR] No synthetic parses found in {data_dir}")
+
+    @staticmethod
+    def closest(text: str, pool: List[Tuple[Set[str], Dict[str, Any]]]) -> Dict[str, Any]:
+        wanted = words(text)
+        start = stable_index(text, len(pool))
+        # Rotating by the hash makes ties (including "no overlap") text-dependent
+        rotated = pool[start:] + pool[:start]
+        return max(rotated, key=lambda entry: len(wanted & entry[0]))[1]
+
+    def parse_request(self, text: str) -> Dict[str, Any]:
+        parse = self.requests_by_text.get(normalize(text)) or self.closest(text, self.requests)
+        parse = copy.deepcopy(parse)
+        parse.setdefault("context", {})["original_text"] = text
+        return parse
+
+    def parse_profile(self, text: str, user_id: str) -> Dict[str, Any]:
+        parse = self.profiles_by_text.get(normalize(text)) or self.closest(text, self.profiles)
+        parse = copy.deepcopy(parse)
+        parse["user_id"] = user_id
+        parse.setdefault("context", {})["original_text"] = text
+        return parse
+
+
+class InjectedFailure(Exception):
+    pass
+
+
+def create_app(data_dir: Path, settings: StubSettings) -> FastAPI:
+    parses = SyntheticParses(data_dir)
+    rng = random.Random(settings.seed)
+    counts: Counter = Counter()
+    stub = FastAPI(title="Gemini parser stub")
+
+    async def simulate() -> None:
+        """Sleep like a Gemini call would, then maybe fail."""
+        counts["parses"] += 1
+        if rng.random() < settings.timeout_rate:
+            counts["timeouts"] += 1
+            await asyncio.sleep(settings.timeout_seconds)
+        else:
+            delay = settings.latency_ms / 1000
+            if settings.jitter > 0:
+                delay *= rng.lognormvariate(0, settings.jitter)
+            await asyncio.sleep(delay)
+        if rng.random() < settings.error_rate:
+            counts["errors"] += 1
+            raise InjectedFailure("Injected Gemini failure.")
+
+    async def run_batch(items: Any, parse_one) -> JSONResponse:
+        if not isinstance(items, list) or not items:
+            return JSONResponse({"error": "Missing 'items' array in request body."}, status_code=400)
+        if len(items) > BATCH_MAX_ITEMS:
+            return JSONResponse({"error": f"At most {BATCH_MAX_ITEMS} items per batch."}, status_code=400)
+
+        lanes = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def one(index: int, item: Any) -> Dict[str, Any]:
+            async with lanes:
+                try:
+                    if not isinstance(item, dict):
+                        raise ValueError("Each item must be a JSON object.")
+                    return {"index": index, "ok": True, "data": await parse_one(item)}
+                except (InjectedFailure, ValueError) as e:
+                    return {"index": index, "ok": False, "error": str(e)}
+
+        counts["batches"] += 1
+        results = await asyncio.gather(*(one(index, item) for index, item in enumerate(items)))
+        return JSONResponse({"results": list(results)})
+
+    async def parse_request_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        if not item.get("text"):
+            raise ValueError("Missing 'text'.")
+        await simulate()
+        return parses.parse_request(item["text"])
+
+    async def parse_profile_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        if not item.get("text") or not item.get("userId"):
+            raise ValueError("Missing 'text' or 'userId'.")
+        await simulate()
+        return parses.parse_profile(item["text"], item["userId"])
+
+    @stub.post("/api/parse-request")
+    async def parse_request(request: Request):
+        body = await request.json()
+        if not body.get("text"):
+            return JSONResponse({"error": "Missing 'text' in request body."}, status_code=400)
+        try:
+            return await parse_request_item(body)
+        except InjectedFailure as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
+
+    @stub.post("/api/parse-profile")
+    async def parse_profile(request: Request):
+        body = await request.json()
+        if not body.get("text") or not body.get("userId"):
+            return JSONResponse({"error": "Missing 'text' or 'userId'."}, status_code=400)
+        try:
+            return await parse_profile_item(body)
+        except InjectedFailure:
+            return JSONResponse({"error": "Failed to parse profile."}, status_code=500)
+
+    @stub.post("/api/parse-request/batch")
+    async def parse_request_batch(request: Request):
+        return await run_batch((await request.json()).get("items"), parse_request_item)
+
+    @stub.post("/api/parse-profile/batch")
+    async def parse_profile_batch(request: Request):
+        return await run_batch((await request.json()).get("items"), parse_profile_item)
+
+    @stub.get("/stub/stats")
+    async def stub_stats() -> Dict[str, Any]:
+        return {"settings": asdict(settings), "counts": dict(counts)}
+
+    @stub.post("/stub/config")
+    async def stub_config(request: Request):
+        changes = await request.json()
+        unknown = set(changes) - set(asdict(settings)) - {"reset_counts"}
+        if unknown:
+            return JSONResponse({"error": f"Unknown settings: {sorted(unknown)}"}, status_code=400)
+        for key, value in changes.items():
+            if key == "reset_counts":
+                if value:
+                    counts.clear()
+                continue
+            if key == "seed":
+                settings.seed = None if value is None else int(value)
+            else:
+                setattr(settings, key, float(value))
+        if "seed" in changes:
+            rng.seed(settings.seed)
+        print(f"[OK] Stub settings: {asdict(settings)}")
+        return {"settings": asdict(settings)}
+
+    print(
+        f"[OK] Loaded {len(parses.requests)} request and {len(parses.profiles)} profile parses from {data_dir}"
+    )
+    return stub
+
+
+def main() -> None:
+    defaults = StubSettings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "3001")))
+    parser.add_argument("--data-dir", type=Path, default=ROOT_DIR / "synthetic-data")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="median parse latency")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="lognormal sigma; 0 is fixed latency")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--timeout-rate", type=float, default=defaults.timeout_rate)
+    parser.add_argument("--timeout-seconds", type=float, default=defaults.timeout_seconds)
+    parser.add_argument("--seed", type=int, default=None, help="make injected latency and failures repeatable")
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        latency_ms=args.latency_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(args.data_dir, settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
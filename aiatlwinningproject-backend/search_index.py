@@ -0,0 +1,271 @@
+"""Text search structures built on top of the listing index."""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from listing_index import ListingIndex
+
+
+NORMALIZE_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text: Any) -> str:
+    """Lower-case and collapse punctuation/underscores to single spaces."""
+    if not text:
+        return ""
+    return NORMALIZE_RE.sub(" ", str(text).lower()).strip()
+
+
+class PrefixSuggester:
+    """
+    Typeahead over listing titles, categories and seller names.
+
+    Every suggestion is keyed by its normalized text and by each
+    word-start suffix ("mini fridge" is also reachable from "fridge").
+    Keys live in one sorted list, so a prefix lookup is two binary
+    searches followed by a top-k selection on the weights of the
+    matching range.
+    """
+
+    def __init__(self, suggestions: List[Tuple[str, str, float]]) -> None:
+        self.texts: List[str] = [text for text, _, _ in suggestions]
+        self.kinds: List[str] = [kind for _, kind, _ in suggestions]
+        self.weights = np.asarray([weight for _, _, weight in suggestions], dtype=np.float64)
+
+        entries: List[Tuple[str, int]] = []
+        for suggestion_id, text in enumerate(self.texts):
+            words = normalize_text(text).split()
+            for start in range(len(words)):
+                entries.append((" ".join(words[start:]), suggestion_id))
+        entries.sort()
+
+        self.keys: List[str] = [key for key, _ in entries]
+        self.key_suggestion = np.asarray([sid for _, sid in entries], dtype=np.int32)
+        self.key_weight = self.weights[self.key_suggestion] if entries else np.zeros(0)
+
+    @classmethod
+    def from_listing_index(cls, index: ListingIndex) -> "PrefixSuggester":
+        """Build suggestions weighted by listing volume and seller sales counts."""
+        seller_sales = np.asarray(index.seller_sales, dtype=np.float64)
+        # Each listing counts once plus its seller's lifetime sales
+        row_weight = 1.0 + (seller_sales[index.seller_index] if len(index) else np.zeros(0))
+
+        titles: Dict[str, Tuple[str, float]] = {}
+        for row, title in enumerate(index.titles):
+            key = normalize_text(title)
+            if not key:
+                continue
+            display, weight = titles.get(key, (title, 0.0))
+            titles[key] = (display, weight + float(row_weight[row]))
+
+        category_weight = np.bincount(
+            index.category_code, weights=row_weight, minlength=len(index.category_names)
+        )
+
+        sellers: Dict[str, float] = defaultdict(float)
+        for name, sales in zip(index.seller_names, index.seller_sales):
+            if normalize_text(name):
+                sellers[name] += float(sales)
+
+        suggestions: List[Tuple[str, str, float]] = []
+        suggestions.extend((display, "title", weight) for display, weight in titles.values())
+        suggestions.extend(
+            (name, "category", float(category_weight[code]))
+            for code, name in enumerate(index.category_names)
+        )
+        suggestions.extend((name, "seller", weight) for name, weight in sellers.items())
+        return cls(suggestions)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` suggestions whose words start with ``query``."""
+        prefix = normalize_text(query)
+        if not prefix or limit <= 0:
+            return []
+
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        if lo == hi:
+            return []
+
+        weights = self.key_weight[lo:hi]
+        suggestion_ids = self.key_suggestion[lo:hi]
+        # A suggestion can match through several of its words, so over-select
+        # before de-duplicating and widen only if that was not enough
+        take = min(len(weights), limit * 4)
+        while True:
+            if take < len(weights):
+                candidates = np.argpartition(-weights, take - 1)[:take]
+            else:
+                candidates = np.arange(len(weights))
+            candidates = candidates[np.argsort(-weights[candidates], kind="stable")]
+
+            seen = set()
+            results: List[Dict[str, Any]] = []
+            for position in candidates:
+                suggestion_id = int(suggestion_ids[position])
+                if suggestion_id in seen:
+                    continue
+                seen.add(suggestion_id)
+                results.append({
+                    "text": self.texts[suggestion_id],
+                    "type": self.kinds[suggestion_id],
+                    "weight": round(float(self.weights[suggestion_id]), 2),
+                })
+                if len(results) >= limit:
+                    return results
+            if take >= len(weights):
+                return results
+            take = len(weights)
+
+
+def word_trigrams(word: str) -> Set[str]:
+    """Character trigrams of a word padded so prefixes and suffixes count."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Edit distance between ``a`` and ``b`` counting an adjacent transposition
+    as one edit ("chiar" -> "chair"), or None once it exceeds ``max_distance``.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if a == b:
+        return 0
+    before_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], before_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        before_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def max_typos(word: str) -> int:
+    """Edit budget for a query word: none for very short words, more for long ones."""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 5:
+        return 1
+    return 2
+
+
+class TrigramIndex:
+    """
+    Typo-tolerant word index over listing titles and descriptions.
+
+    Trigrams map to vocabulary words rather than rows, so candidate
+    generation only scans the (small) vocabulary; every candidate word is
+    verified with a bounded edit distance before its posting list of
+    rows is consulted.  A row matches when every query word matches one
+    of its words.
+    """
+
+    def __init__(self, documents: Sequence[str]) -> None:
+        vocabulary: Dict[str, int] = {}
+        row_words: List[int] = []
+        word_rows: List[int] = []
+        for row, document in enumerate(documents):
+            for word in set(normalize_text(document).split()):
+                word_id = vocabulary.get(word)
+                if word_id is None:
+                    word_id = vocabulary[word] = len(vocabulary)
+                row_words.append(word_id)
+                word_rows.append(row)
+
+        self.row_count = len(documents)
+        self.words: List[str] = list(vocabulary)
+        self.word_lengths = np.asarray([len(word) for word in self.words], dtype=np.int32)
+
+        # CSR posting lists: rows containing word w are rows[offsets[w]:offsets[w + 1]]
+        pair_words = np.asarray(row_words, dtype=np.int32)
+        pair_rows = np.asarray(word_rows, dtype=np.int32)
+        order = np.argsort(pair_words, kind="stable")
+        self.posting_rows = pair_rows[order]
+        self.posting_offsets = np.zeros(len(self.words) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_words, minlength=len(self.words)), out=self.posting_offsets[1:])
+
+        trigram_words: Dict[str, List[int]] = defaultdict(list)
+        for word_id, word in enumerate(self.words):
+            for trigram in word_trigrams(word):
+                trigram_words[trigram].append(word_id)
+        self.trigram_words: Dict[str, np.ndarray] = {
+            trigram: np.asarray(ids, dtype=np.int32) for trigram, ids in trigram_words.items()
+        }
+
+    @classmethod
+    def from_listing_index(cls, index: ListingIndex) -> "TrigramIndex":
+        """Index each listing's title and description as one document."""
+        return cls([
+            f"{title} {description}"
+            for title, description in zip(index.titles, index.descriptions)
+        ])
+
+    def rows_for_word(self, word_id: int) -> np.ndarray:
+        """Rows whose title or description contains vocabulary word ``word_id``."""
+        return self.posting_rows[self.posting_offsets[word_id]:self.posting_offsets[word_id + 1]]
+
+    def match_word(self, word: str) -> List[Tuple[int, int]]:
+        """Vocabulary words within the edit budget of ``word`` as (word_id, distance)."""
+        budget = max_typos(word)
+        trigrams = [self.trigram_words[t] for t in word_trigrams(word) if t in self.trigram_words]
+        if not trigrams:
+            return []
+
+        overlap = np.bincount(np.concatenate(trigrams), minlength=len(self.words))
+        # One edit (including a transposition) disturbs at most four trigrams,
+        # so words sharing fewer than this cannot be within budget
+        required = max(1, len(word_trigrams(word)) - 4 * budget)
+        candidates = np.nonzero(
+            (overlap >= required) & (np.abs(self.word_lengths - len(word)) <= budget)
+        )[0]
+
+        matches: List[Tuple[int, int]] = []
+        for word_id in candidates:
+            distance = bounded_edit_distance(word, self.words[word_id], budget)
+            if distance is not None:
+                matches.append((int(word_id), distance))
+        return matches
+
+    def search(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return ``(mask, score)`` arrays over all rows for a fuzzy query.
+
+        ``score`` sums, per query word, the best similarity
+        ``1 - distance / len(word)`` among the row's words; rows missing
+        any query word are masked out.
+        """
+        mask = np.zeros(self.row_count, dtype=bool)
+        score = np.zeros(self.row_count, dtype=np.float32)
+        query_words = normalize_text(query).split()
+        if not query_words or not self.row_count:
+            return mask, score
+
+        mask[:] = True
+        for word in query_words:
+            word_score = np.zeros(self.row_count, dtype=np.float32)
+            for word_id, distance in self.match_word(word):
+                rows = self.rows_for_word(word_id)
+                word_score[rows] = np.maximum(word_score[rows], 1.0 - distance / max(len(word), 1))
+            mask &= word_score > 0
+            score += word_score
+        score[~mask] = 0
+        return mask, score
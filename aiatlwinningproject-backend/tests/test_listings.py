@@ -0,0 +1,38 @@
+"""Tests for GET /api/listings search and facet counts."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+
+def get_listings(**params):
+    return asyncio.run(app.get_listings(**params))
+
+
+def test_facets_count_fuzzy_fallback_rows():
+    # "chiar" matches nothing exactly; the typo-tolerant fallback finds the chairs
+    response = get_listings(search="chiar", facets=True)
+    listings = response["listings"]
+    facets = response["facets"]
+
+    assert listings
+    assert response["fuzzyMatches"] == len(listings)
+
+    categories = {}
+    for listing in listings:
+        categories[listing["category"]] = categories.get(listing["category"], 0) + 1
+    assert {name: count for name, count in facets["categories"].items() if count} == categories
+    assert facets["verified"] == sum(1 for listing in listings if listing["owner"].get("verified"))
+    assert sum(bucket["count"] for bucket in facets["priceBuckets"]) == len(listings)
+
+
+def test_facets_ignore_their_own_filter_with_fuzzy_fallback():
+    unfiltered = get_listings(search="chiar", facets=True)
+    response = get_listings(search="chiar", priceMax=0, facets=True)
+
+    assert response["listings"] == []
+    # The price facet leaves out the price filter, so it still sees every fuzzy match
+    assert sum(bucket["count"] for bucket in response["facets"]["priceBuckets"]) == unfiltered["total"]
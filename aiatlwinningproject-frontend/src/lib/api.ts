@@ -198,6 +198,13 @@ type ListingsFilters = {
   category?: string
   priceMax?: number
   verifiedOnly?: boolean
+  facets?: boolean
+}
+
+export interface ListingFacets {
+  categories: Record<string, number>
+  verified: number
+  priceBuckets: { min: number; max: number | null; count: number }[]
 }
 
 // API functions - all calls go to backend
@@ -244,7 +251,15 @@ export const api = {
     }
   },
 
-  getSmartMatches: async (requestId: string): Promise<{ success: boolean; requestId: string; requestData: any; matches: Match[]; debug?: any }> => {
+  getSmartMatches: async (requestId: string): Promise<{
+    success: boolean
+    requestId: string
+    requestData: any
+    matches: Match[]
+    debug?: any
+    matchVersion: number
+    refinementPending: boolean
+  }> => {
     try {
       const response = await request<{
         success: boolean
@@ -252,6 +267,8 @@ export const api = {
         request: any
         matches: Array<Match & { debug?: any }>
         debug?: any
+        matchVersion?: number
+        refinementPending?: boolean
       }>(`/api/flash-requests/${requestId}/matches`)
 
       if (!response) {
@@ -270,6 +287,9 @@ export const api = {
           debug: match.debug,
         })),
         debug: response.debug,
+        // Matches from the local parse are version 1; the Gemini-refined set replaces them
+        matchVersion: response.matchVersion ?? 1,
+        refinementPending: Boolean(response.refinementPending),
       }
     } catch (error: any) {
       console.error('getSmartMatches API error:', error)
@@ -295,8 +315,8 @@ export const api = {
     return data
   },
 
-  searchListings: async (filters: ListingsFilters = {}): Promise<{ listings: Listing[] }> => {
-    const { search = '', category, priceMax, verifiedOnly } = filters
+  searchListings: async (filters: ListingsFilters = {}): Promise<{ listings: Listing[]; facets?: ListingFacets }> => {
+    const { search = '', category, priceMax, verifiedOnly, facets } = filters
 
     try {
       const params = new URLSearchParams()
@@ -304,15 +324,18 @@ export const api = {
       if (category && category !== 'All') params.append('category', category)
       if (priceMax !== undefined) params.append('priceMax', priceMax.toString())
       if (verifiedOnly) params.append('verifiedOnly', 'true')
+      if (facets) params.append('facets', 'true')
 
       const response = await request<{
         success: boolean
         listings: Listing[]
         total: number
+        facets?: ListingFacets
       }>(`/api/listings?${params.toString()}`)
 
       return {
         listings: response.listings || [],
+        facets: response.facets,
       }
     } catch (error) {
       console.error('Error fetching listings from backend:', error)
@@ -323,6 +346,21 @@ export const api = {
     }
   },
 
+  suggestListings: async (q: string, limit = 8): Promise<{ text: string; type: 'title' | 'category' | 'seller'; weight: number }[]> => {
+    if (!q.trim()) return []
+    try {
+      const params = new URLSearchParams({ q, limit: limit.toString() })
+      const response = await request<{
+        success: boolean
+        suggestions: { text: string; type: 'title' | 'category' | 'seller'; weight: number }[]
+      }>(`/api/listings/suggest?${params.toString()}`)
+      return response.suggestions || []
+    } catch (error) {
+      console.error('Error fetching listing suggestions:', error)
+      return []
+    }
+  },
+
   getMessages: async (): Promise<{ success: boolean; threads: any[] }> => {
     try {
       // Try to fetch from backend first
@@ -341,10 +379,23 @@ export const api = {
     }
   },
 
-  getThreadMessages: async (threadId: string): Promise<{ success: boolean; messages: any[] }> => {
+  getThreadMessages: async (
+    threadId: string,
+    page: { before?: string; after?: string; limit?: number } = {},
+  ): Promise<{ success: boolean; messages: any[]; nextCursor: string | null; hasMore: boolean }> => {
     try {
       console.log(`[api.getThreadMessages] Fetching messages for threadId: ${threadId}`)
-      const response = await request<{ success: boolean; messages: any[] }>(`/api/messages/${threadId}`)
+      const params = new URLSearchParams()
+      if (page.before) params.append('before', page.before)
+      if (page.after) params.append('after', page.after)
+      if (page.limit) params.append('limit', page.limit.toString())
+      const query = params.toString()
+      const response = await request<{
+        success: boolean
+        messages: any[]
+        nextCursor?: string | null
+        hasMore?: boolean
+      }>(`/api/messages/${threadId}${query ? `?${query}` : ''}`)
       console.log(`[api.getThreadMessages] Received ${response.messages?.length || 0} messages`)
       
       // Convert ISO timestamp to readable format and ensure all required fields
@@ -356,12 +407,15 @@ export const api = {
           ? new Date(msg.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
           : 'Just now',
         isOwn: msg.isOwn !== undefined ? msg.isOwn : false,
+        cursor: msg.cursor,
       }))
       
       console.log(`[api.getThreadMessages] Processed ${messages.length} messages`)
       return {
         success: true,
         messages,
+        nextCursor: response.nextCursor ?? null,
+        hasMore: response.hasMore ?? false,
       }
     } catch (error) {
       console.error('[api.getThreadMessages] ❌ Error fetching thread messages from backend:', error)
@@ -369,10 +423,24 @@ export const api = {
       return {
         success: false,
         messages: [],
+        nextCursor: null,
+        hasMore: false,
       }
     }
   },
 
+  markThreadRead: async (threadId: string, upTo?: string): Promise<{ success: boolean; marked: number }> => {
+    try {
+      return await request<{ success: boolean; marked: number }>(`/api/messages/${threadId}/read`, {
+        method: 'POST',
+        body: JSON.stringify(upTo ? { upTo } : {}),
+      })
+    } catch (error) {
+      console.error('[api.markThreadRead] Failed to mark thread read:', error)
+      return { success: false, marked: 0 }
+    }
+  },
+
   sendMessage: async (
      threadId: string,
      text: string,
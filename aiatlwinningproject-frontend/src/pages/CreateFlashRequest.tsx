@@ -163,6 +163,8 @@ export default function CreateFlashRequest() {
               requestData: result.data.request || result.data.requestData,
               matches: result.data.matches || [],
               debug: result.data.debug,
+              matchVersion: result.data.matchVersion,
+              refinementPending: result.data.refinementPending,
             }
           })
         } else {
@@ -14,6 +14,7 @@ import { Textarea } from '@/components/ui/textarea'
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogDescription } from '@/components/ui/dialog'
 import { api } from '@/lib/api'
 import { getOrCreateDM } from '@/services/chat'
+import { subscribeRealtime } from '@/services/realtime'
 import { toast } from 'sonner'
 import { cn } from '@/lib/utils'
 
@@ -33,6 +34,7 @@ interface Message {
   text: string
   timestamp: string
   isOwn: boolean
+  cursor?: string
 }
 
 const smartReplies = [
@@ -135,6 +137,12 @@ export function MessagesChatPage() {
   const [loadingThread, setLoadingThread] = useState(false)
   const messagesEndRef = useRef<HTMLDivElement>(null)
   const threadsLoadedRef = useRef(false)
+  // Cursor for the next page of older history (null once the start of the thread is loaded)
+  const [olderCursor, setOlderCursor] = useState<string | null>(null)
+  const [loadingOlder, setLoadingOlder] = useState(false)
+  // Older pages loaded on demand; refreshes only fetch the newest page, so keep these around
+  const olderMessagesRef = useRef<Message[]>([])
+  const skipScrollRef = useRef(false)
   const [currentSellerName, setCurrentSellerName] = useState<string | null>(null)
 
   // Get thread ID from URL params or navigation state
@@ -208,8 +216,19 @@ export function MessagesChatPage() {
     try {
       // Load messages directly from backend
       const result = await api.getThreadMessages(threadId)
-      const loadedMessages = result.messages || []
-      console.log(`[loadMessages] ✅ Loaded ${loadedMessages.length} messages from backend`)
+      if (!preserveExisting) {
+        olderMessagesRef.current = []
+        setOlderCursor(result.nextCursor)
+      } else if (olderMessagesRef.current.length === 0) {
+        setOlderCursor(result.nextCursor)
+      }
+      const newestPage: Message[] = result.messages || []
+      const newestIds = new Set(newestPage.map(m => m.id))
+      const loadedMessages: Message[] = [
+        ...olderMessagesRef.current.filter(m => !newestIds.has(m.id)),
+        ...newestPage,
+      ]
+      console.log(`[loadMessages] ✅ Loaded ${newestPage.length} messages from backend`)
       
       if (loadedMessages.length > 0) {
         console.log(`[loadMessages] First message:`, loadedMessages[0])
@@ -551,6 +570,49 @@ export function MessagesChatPage() {
     }
   }, [loadThreads, location.pathname, selectedThread, selectedUserId, loadMessages])
 
+  // Pushed messages: append to the open thread and refresh the thread list,
+  // instead of re-requesting the whole conversation
+  const selectedThreadRef = useRef(selectedThread)
+  useEffect(() => {
+    selectedThreadRef.current = selectedThread
+  }, [selectedThread])
+
+  useEffect(() => {
+    return subscribeRealtime(event => {
+      if (event.type !== 'message') return
+      const currentUserId = localStorage.getItem('userId')
+      if (event.threadId === selectedThreadRef.current) {
+        const incoming: Message = {
+          id: event.message.id,
+          senderId: event.message.senderId,
+          text: event.message.text,
+          timestamp: new Date(event.message.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
+          isOwn: event.message.senderId === currentUserId,
+          cursor: event.message.cursor,
+        }
+        setMessages(prevMessages => {
+          if (prevMessages.some(m => m.id === incoming.id)) return prevMessages
+          // Our own send echoes back; replace its optimistic copy
+          const optimisticIndex = incoming.isOwn
+            ? prevMessages.findIndex(m => m.id.startsWith('temp-') && m.text.trim() === incoming.text.trim())
+            : -1
+          if (optimisticIndex >= 0) {
+            const next = [...prevMessages]
+            next[optimisticIndex] = incoming
+            return next
+          }
+          return [...prevMessages, incoming]
+        })
+        // The thread is on screen, so the new message is read as it arrives
+        if (!incoming.isOwn) {
+          api.markThreadRead(event.threadId, event.message.cursor).then(() => loadThreads())
+          return
+        }
+      }
+      loadThreads()
+    })
+  }, [loadThreads])
+
   // Handle thread selection from URL params or navigation state
   useEffect(() => {
     if (!threadsLoadedRef.current) {
@@ -663,12 +725,42 @@ export function MessagesChatPage() {
     // Load messages from backend - this will merge with any optimistic messages
     // Use preserveExisting=false to replace with backend data, but loadMessages will keep optimistic messages
     loadMessages(selectedThread, selectedUserId, false)
+
+    // Opening a thread reads it: clear the badge locally and on the server
+    setThreads(prevThreads => prevThreads.map(t => (t.id === selectedThread ? { ...t, unread: 0 } : t)))
+    api.markThreadRead(selectedThread)
   }, [selectedThread, selectedUserId, loadMessages])
 
   useEffect(() => {
+    // Prepending older history should keep the reader where they are
+    if (skipScrollRef.current) {
+      skipScrollRef.current = false
+      return
+    }
     scrollToBottom()
   }, [messages])
 
+  const loadOlderMessages = async () => {
+    if (!selectedThread || !olderCursor || loadingOlder) return
+    const threadId = selectedThread
+    setLoadingOlder(true)
+    try {
+      const result = await api.getThreadMessages(threadId, { before: olderCursor })
+      if (!result.success) return
+      olderMessagesRef.current = [...result.messages, ...olderMessagesRef.current]
+      setOlderCursor(result.nextCursor)
+      skipScrollRef.current = true
+      setMessages(prevMessages => {
+        const knownIds = new Set(prevMessages.map(m => m.id))
+        return [...result.messages.filter((m: Message) => !knownIds.has(m.id)), ...prevMessages]
+      })
+    } catch (error) {
+      console.error('[loadOlderMessages] ❌ Failed to load older messages:', error)
+    } finally {
+      setLoadingOlder(false)
+    }
+  }
+
 
   const handleThreadSelect = (threadId: string) => {
     const thread = threads.find(t => t.id === threadId)
@@ -679,6 +771,8 @@ export function MessagesChatPage() {
 
     // Clear messages immediately when switching threads
     setMessages([])
+    olderMessagesRef.current = []
+    setOlderCursor(null)
     setSelectedThread(threadId)
     setSelectedUserId(thread.userId)
     
@@ -1305,6 +1399,18 @@ export function MessagesChatPage() {
 
               {/* Messages Area */}
               <div className="flex-1 overflow-y-auto p-4 space-y-4">
+                {olderCursor && messages.length > 0 && (
+                  <div className="flex justify-center">
+                    <Button
+                      variant="ghost"
+                      size="sm"
+                      onClick={loadOlderMessages}
+                      disabled={loadingOlder}
+                    >
+                      {loadingOlder ? 'Loading...' : 'Load earlier messages'}
+                    </Button>
+                  </div>
+                )}
                 {messages.length === 0 ? (
                   <div className="flex items-center justify-center h-full text-muted-foreground">
                     <p>No messages yet. Start the conversation!</p>
@@ -18,7 +18,8 @@ import {
   XCircle,
   Package,
   Tag,
-  X
+  X,
+  Loader2
 } from 'lucide-react'
 import { cn } from '@/lib/utils'
 import TrustBadge from '@/components/TrustBadge'
@@ -190,6 +191,9 @@ const SellerDebugPopup = ({ sellers }: { sellers: SellerDebugEntry[] }) => {
   )
 }
 
+const REFINEMENT_POLL_INTERVAL_MS = 1500
+const REFINEMENT_POLL_ATTEMPTS = 20
+
 export function SmartPingMatchesPage() {
   const [searchParams] = useSearchParams()
   const navigate = useNavigate()
@@ -197,7 +201,13 @@ export function SmartPingMatchesPage() {
   const requestId = searchParams.get('requestId') || 'demo'
 
   // Check if we have data passed from navigation state (from CreateFlashRequest)
-  const navigationState = location.state as { requestData?: any; matches?: any[]; debug?: any } | null
+  const navigationState = location.state as {
+    requestData?: any
+    matches?: any[]
+    debug?: any
+    matchVersion?: number
+    refinementPending?: boolean
+  } | null
 
   const [requestData, setRequestData] = useState<RequestData | null>(null)
   const [matches, setMatches] = useState<SmartPingMatch[]>([])
@@ -219,6 +229,8 @@ export function SmartPingMatchesPage() {
   const [openSellerProfileId, setOpenSellerProfileId] = useState<string | null>(null)
   const [debugPopups, setDebugPopups] = useState<DebugPopupDescriptor[]>([])
   const lastPopupRequestRef = useRef<string | null>(null)
+  const [refinementPending, setRefinementPending] = useState(false)
+  const matchVersionRef = useRef(0)
 
   const resolveUrgencyLabel = (value?: string | null) => {
     switch (value) {
@@ -235,6 +247,36 @@ export function SmartPingMatchesPage() {
     }
   }
 
+  const applyMatchResult = (parsed: any, rawMatches: any[], debug: any) => {
+    setParsedRequest(parsed)
+    setDebugInfo(debug || null)
+    setRequestData({
+      description: parsed?.context?.original_text || parsed?.item_meta?.parsed_item || '—',
+      category: parsed?.item_meta?.category || '—',
+      urgencyLabel: resolveUrgencyLabel(parsed?.context?.urgency),
+      location: parsed?.location?.text_input || '—',
+      requireCheckIn: Boolean(debug?.requestMetadata?.requireCheckIn),
+      parsedItem: parsed?.item_meta?.parsed_item,
+      priceMax: parsed?.transaction?.price_max ?? null,
+    })
+    const mappedMatches: SmartPingMatch[] = (rawMatches || []).map((item: any, index: number) => ({
+      id: item.user?.id ?? `${item.user?.name || 'User'}-${index}`,
+      userId: item.user?.id || '',
+      responderUserId: item.user?.id || '',
+      responderName: item.user?.name || 'User',
+      name: item.user?.name || 'User',
+      major: item.user?.major || 'Undeclared',
+      dorm: item.user?.dorm || 'On campus',
+      distance: `${(item.distanceMin || 0).toFixed(1)} mi`,
+      likelihood: item.likelihood || 0,
+      badges: item.user?.badges ?? [],
+      status: null,
+      debug: item.debug,
+    }))
+    setMatches(mappedMatches)
+    return mappedMatches
+  }
+
   const formatProbability = (value?: number | null) => {
     const numeric = typeof value === 'number' ? value : 0
     return (numeric * 100).toFixed(1)
@@ -400,39 +442,12 @@ export function SmartPingMatchesPage() {
         // If we have data from navigation state, use it first
         if (navigationState && navigationState.requestData && navigationState.matches) {
           console.log(`[SmartPingMatchesPage] Using data from navigation state for requestId: ${requestId}`)
-          const parsed = navigationState.requestData
-          setParsedRequest(parsed)
-          setDebugInfo(navigationState.debug || null)
+          applyMatchResult(navigationState.requestData, navigationState.matches, navigationState.debug)
+          matchVersionRef.current = navigationState.matchVersion ?? 1
+          setRefinementPending(Boolean(navigationState.refinementPending))
           setDebugPanelVisible(true)
           setDebugDockVisible(true)
           setActiveDebugPopupId(null)
-
-          const summary: RequestData = {
-            description: parsed?.context?.original_text || parsed?.item_meta?.parsed_item || '—',
-            category: parsed?.item_meta?.category || '—',
-            urgencyLabel: resolveUrgencyLabel(parsed?.context?.urgency),
-            location: parsed?.location?.text_input || '—',
-            requireCheckIn: Boolean(navigationState.debug?.requestMetadata?.requireCheckIn),
-            parsedItem: parsed?.item_meta?.parsed_item,
-            priceMax: parsed?.transaction?.price_max ?? null,
-          }
-          setRequestData(summary)
-          
-          const mappedMatches: SmartPingMatch[] = (navigationState.matches || []).map((item: any, index: number) => ({
-            id: item.user?.id ?? `${item.user?.name || 'User'}-${index}`,
-            userId: item.user?.id || '',
-            responderUserId: item.user?.id || '',
-            responderName: item.user?.name || 'User',
-            name: item.user?.name || 'User',
-            major: item.user?.major || 'Undeclared',
-            dorm: item.user?.dorm || 'On campus',
-            distance: `${(item.distanceMin || 0).toFixed(1)} mi`,
-            likelihood: item.likelihood || 0,
-            badges: item.user?.badges ?? [],
-            status: null,
-            debug: item.debug,
-          }))
-          setMatches(mappedMatches)
           setOpenDebugMatchId(null)
           setSelectedMatches(new Set())
           setLoading(false)
@@ -442,38 +457,12 @@ export function SmartPingMatchesPage() {
         // Otherwise, fetch from API
         console.log(`[SmartPingMatchesPage] Fetching matches from API for requestId: ${requestId}`)
         const result = await api.getSmartMatches(requestId)
-        const parsed = result.requestData || {}
-        setParsedRequest(parsed)
-        setDebugInfo(result.debug || null)
+        applyMatchResult(result.requestData || {}, result.matches, result.debug)
+        matchVersionRef.current = result.matchVersion
+        setRefinementPending(result.refinementPending)
         setDebugPanelVisible(true)
         setDebugDockVisible(true)
         setActiveDebugPopupId(null)
-
-        const summary: RequestData = {
-          description: parsed?.context?.original_text || parsed?.item_meta?.parsed_item || '—',
-          category: parsed?.item_meta?.category || '—',
-          urgencyLabel: resolveUrgencyLabel(parsed?.context?.urgency),
-          location: parsed?.location?.text_input || '—',
-          requireCheckIn: Boolean(result?.debug?.requestMetadata?.requireCheckIn),
-          parsedItem: parsed?.item_meta?.parsed_item,
-          priceMax: parsed?.transaction?.price_max ?? null,
-        }
-        setRequestData(summary)
-        const mappedMatches: SmartPingMatch[] = result.matches.map((item, index) => ({
-          id: item.user.id ?? `${item.user.name}-${index}`,
-          userId: item.user.id,
-          responderUserId: item.user.id,
-          responderName: item.user.name,
-          name: item.user.name,
-          major: item.user.major,
-          dorm: item.user.dorm,
-          distance: `${item.distanceMin.toFixed(1)} mi`,
-          likelihood: item.likelihood,
-          badges: item.user.badges ?? [],
-          status: null,
-          debug: item.debug,
-        }))
-        setMatches(mappedMatches)
         setOpenDebugMatchId(null)
         setSelectedMatches(new Set())
       } catch (error: any) {
@@ -529,6 +518,46 @@ export function SmartPingMatchesPage() {
     fetchMatches()
   }, [requestId, navigationState])
 
+  // Matches from the local parse are swapped for the Gemini-refined set when it lands
+  useEffect(() => {
+    if (!refinementPending || requestId === 'demo') return
+    let cancelled = false
+    let attempts = 0
+    let timer = 0
+
+    const poll = async () => {
+      attempts += 1
+      try {
+        const result = await api.getSmartMatches(requestId)
+        if (cancelled) return
+        if (result.matchVersion > matchVersionRef.current) {
+          matchVersionRef.current = result.matchVersion
+          const refined = applyMatchResult(result.requestData || {}, result.matches, result.debug)
+          setSelectedMatches((prev) => new Set([...prev].filter((id) => refined.some((match) => match.id === id))))
+          lastPopupRequestRef.current = null
+        }
+        if (!result.refinementPending) {
+          setRefinementPending(false)
+          return
+        }
+      } catch (error) {
+        console.warn('[SmartPingMatchesPage] Polling for refined matches failed:', error)
+      }
+      if (cancelled) return
+      if (attempts >= REFINEMENT_POLL_ATTEMPTS) {
+        setRefinementPending(false)
+        return
+      }
+      timer = window.setTimeout(poll, REFINEMENT_POLL_INTERVAL_MS)
+    }
+
+    timer = window.setTimeout(poll, REFINEMENT_POLL_INTERVAL_MS)
+    return () => {
+      cancelled = true
+      window.clearTimeout(timer)
+    }
+  }, [refinementPending, requestId])
+
   useEffect(() => {
     if (!debugInfo || !parsedRequest || matches.length === 0) return
     if (lastPopupRequestRef.current === requestId) return
@@ -821,6 +850,12 @@ export function SmartPingMatchesPage() {
                 <span className="text-sm font-medium">Matches Found</span>
                 <span className="text-2xl font-bold text-primary">{matches.length}</span>
               </div>
+              {refinementPending && (
+                <p className="mt-2 flex items-center gap-2 text-xs text-muted-foreground">
+                  <Loader2 className="h-3 w-3 animate-spin" />
+                  Refining matches…
+                </p>
+              )}
             </div>
           </motion.div>
         </div>
@@ -0,0 +1,97 @@
+export interface RealtimeMessageEvent {
+  type: 'message'
+  threadId: string
+  message: {
+    id: string
+    senderId: string
+    text: string
+    timestamp: string
+    cursor: string
+  }
+}
+
+export interface RealtimePingEvent {
+  type: 'ping'
+  requestId: string
+  text: string
+  broadcastType: string | null
+  timestamp: string
+}
+
+export type RealtimeEvent = RealtimeMessageEvent | RealtimePingEvent
+
+type Listener = (event: RealtimeEvent) => void
+
+const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || (import.meta.env.DEV ? '' : 'http://127.0.0.1:8000')
+const KEEPALIVE_MS = 25_000
+const MAX_RECONNECT_MS = 30_000
+
+const listeners = new Set<Listener>()
+let socket: WebSocket | null = null
+let reconnectTimer: ReturnType<typeof setTimeout> | null = null
+let reconnectDelay = 1000
+
+function socketUrl(token: string): string {
+  const base = API_BASE_URL || window.location.origin
+  const url = new URL('/ws', base)
+  url.protocol = url.protocol === 'https:' ? 'wss:' : 'ws:'
+  url.searchParams.set('token', token)
+  return url.toString()
+}
+
+function connect() {
+  const token = localStorage.getItem('accessToken')
+  if (!token || socket || listeners.size === 0) return
+
+  const ws = new WebSocket(socketUrl(token))
+  let keepaliveTimer: ReturnType<typeof setInterval> | null = null
+  socket = ws
+
+  ws.onopen = () => {
+    console.log('[realtime] Connected')
+    reconnectDelay = 1000
+    keepaliveTimer = setInterval(() => ws.send(JSON.stringify({ type: 'ping' })), KEEPALIVE_MS)
+  }
+
+  ws.onmessage = (msg) => {
+    try {
+      const event = JSON.parse(msg.data)
+      if (event.type === 'pong') return
+      listeners.forEach(listener => listener(event as RealtimeEvent))
+    } catch (error) {
+      console.warn('[realtime] Ignoring malformed event:', error)
+    }
+  }
+
+  ws.onclose = (event) => {
+    if (keepaliveTimer) clearInterval(keepaliveTimer)
+    // A socket closed by the last unsubscribe may finish closing after a new one opened
+    if (socket !== ws) return
+    socket = null
+    // 1008: token rejected; wait for a new login instead of retrying
+    if (event.code === 1008 || listeners.size === 0) return
+    console.log(`[realtime] Disconnected (${event.code}), retrying in ${reconnectDelay}ms`)
+    reconnectTimer = setTimeout(() => {
+      reconnectTimer = null
+      connect()
+    }, reconnectDelay)
+    reconnectDelay = Math.min(reconnectDelay * 2, MAX_RECONNECT_MS)
+  }
+}
+
+/**
+ * Listen for pushed messages and pings. One shared socket serves every
+ * subscriber; it opens with the first subscription and closes with the last.
+ */
+export function subscribeRealtime(listener: Listener): () => void {
+  listeners.add(listener)
+  connect()
+  return () => {
+    listeners.delete(listener)
+    if (listeners.size > 0) return
+    if (reconnectTimer) clearTimeout(reconnectTimer)
+    reconnectTimer = null
+    socket?.close(1000)
+    socket = null
+  }
+}
@@ -17,7 +17,8 @@ app.use((req, res, next) => {
   next();
 });
 
-app.use(express.json());
+// Batch routes carry up to BATCH_MAX_ITEMS texts per body
+app.use(express.json({ limit: '1mb' }));
 app.use(express.static(path.join(__dirname, '..', 'public')));
 app.use('/', geminiRoutes);
 
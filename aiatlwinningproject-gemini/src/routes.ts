@@ -3,6 +3,50 @@ import { parseBuyerRequest, parseSellerProfile } from "./services/gemini.service
 
 const router = Router();
 
+// Upper bound on items per batch call, and on Gemini calls a batch runs at once
+const BATCH_MAX_ITEMS = Number(process.env.BATCH_MAX_ITEMS ?? 50);
+const BATCH_CONCURRENCY = Math.max(1, Number(process.env.BATCH_CONCURRENCY ?? 4));
+
+type BatchResult<T> = { index: number; ok: true; data: T } | { index: number; ok: false; error: string };
+
+// Runs worker over items with at most `limit` in flight; one failure does not fail the batch
+async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  worker: (item: T) => Promise<R>,
+): Promise<BatchResult<R>[]> {
+  const results: BatchResult<R>[] = new Array(items.length);
+  let next = 0;
+
+  const runLane = async () => {
+    while (next < items.length) {
+      const index = next++;
+      try {
+        results[index] = { index, ok: true, data: await worker(items[index]) };
+      } catch (error) {
+        const message = error instanceof Error ? error.message : "Failed to parse item.";
+        results[index] = { index, ok: false, error: message };
+      }
+    }
+  };
+
+  await Promise.all(Array.from({ length: Math.min(limit, items.length) }, runLane));
+  return results;
+}
+
+function readBatchItems(req: Request, res: Response): any[] | null {
+  const { items } = req.body ?? {};
+  if (!Array.isArray(items) || items.length === 0) {
+    res.status(400).json({ error: "Missing 'items' array in request body." });
+    return null;
+  }
+  if (items.length > BATCH_MAX_ITEMS) {
+    res.status(400).json({ error: `At most ${BATCH_MAX_ITEMS} items per batch.` });
+    return null;
+  }
+  return items;
+}
+
 router.post("/api/parse-request", async (req: Request, res: Response) => {
   try {
     const { text } = req.body;
@@ -21,6 +65,19 @@ router.post("/api/parse-request", async (req: Request, res: Response) => {
   }
 });
 
+router.post("/api/parse-request/batch", async (req: Request, res: Response) => {
+  const items = readBatchItems(req, res);
+  if (!items) return;
+
+  const results = await mapWithConcurrency(items, BATCH_CONCURRENCY, async (item) => {
+    if (!item?.text) {
+      throw new Error("Missing 'text'.");
+    }
+    return parseBuyerRequest(item.text);
+  });
+  res.status(200).json({ results });
+});
+
 router.post("/api/parse-profile", async (req: Request, res: Response) => {
   try {
     const { text, userId } = req.body;
@@ -36,4 +93,17 @@ router.post("/api/parse-profile", async (req: Request, res: Response) => {
   }
 });
 
+router.post("/api/parse-profile/batch", async (req: Request, res: Response) => {
+  const items = readBatchItems(req, res);
+  if (!items) return;
+
+  const results = await mapWithConcurrency(items, BATCH_CONCURRENCY, async (item) => {
+    if (!item?.text || !item?.userId) {
+      throw new Error("Missing 'text' or 'userId'.");
+    }
+    return parseSellerProfile(item.text, item.userId);
+  });
+  res.status(200).json({ results });
+});
+
 export default router;